@@ -0,0 +1,137 @@
+import argparse
+import asyncio
+import sys
+from collections.abc import AsyncIterator
+from pathlib import Path
+
+import repositories.user  # noqa: F401  registers the user indexes
+from core.config import settings
+from core.cpu import available_cpus
+from core.security import calibrate_password_hash
+from database.mongodb import mongodb
+from repositories.indexes import ensure_indexes, find_collection_scans
+from schemas.user import UserImportReport
+from services.user_import import ImportFormat, import_users
+
+
+def calibrate_argon2(args: argparse.Namespace) -> None:
+    """Print argon2 settings that hit the requested verify latency.
+
+    Args:
+        args: Parsed command line arguments.
+    """
+    params = calibrate_password_hash(
+        target_ms=args.target_ms, parallelism=args.parallelism, samples=args.samples
+    )
+    print(f"# Median verify latency: {params['verify_ms']} ms")
+    print(f"ARGON2_TIME_COST={params['time_cost']}")
+    print(f"ARGON2_MEMORY_COST={params['memory_cost']}")
+    print(f"ARGON2_PARALLELISM={params['parallelism']}")
+
+
+async def _check_indexes(create: bool) -> list[str]:
+    await mongodb.connect()
+    try:
+        if create:
+            await ensure_indexes(mongodb.db)
+        return await find_collection_scans(mongodb.db)
+    finally:
+        await mongodb.disconnect()
+
+
+def check_indexes(args: argparse.Namespace) -> None:
+    """Explain every repository query and fail if any scans a collection.
+
+    Args:
+        args: Parsed command line arguments.
+    """
+    collection_scans = asyncio.run(_check_indexes(create=args.create))
+    for collection_scan in collection_scans:
+        print(f"COLLSCAN {collection_scan}")
+    if collection_scans:
+        sys.exit(1)
+    print("Every repository query uses an index")
+
+
+async def _read_chunks(path: Path, chunk_size: int = 65536) -> AsyncIterator[bytes]:
+    with path.open("rb") as file:
+        while chunk := await asyncio.to_thread(file.read, chunk_size):
+            yield chunk
+
+
+async def _import_users(path: Path, import_format: ImportFormat) -> UserImportReport:
+    await mongodb.connect()
+    try:
+        # The unique indexes are what reject duplicate users.
+        await ensure_indexes(mongodb.db)
+        # Outside the server, the import can use every available CPU.
+        return await import_users(
+            chunks=_read_chunks(path),
+            import_format=import_format,
+            hash_workers=settings.USER_IMPORT_HASH_WORKERS or available_cpus(),
+        )
+    finally:
+        await mongodb.disconnect()
+
+
+def import_users_command(args: argparse.Namespace) -> None:
+    """Import users from an NDJSON or CSV file and print the report.
+
+    Args:
+        args: Parsed command line arguments.
+    """
+    import_format = args.format or ("csv" if args.path.suffix == ".csv" else "ndjson")
+    report = asyncio.run(_import_users(path=args.path, import_format=import_format))
+    for error in report.errors:
+        print(f"line {error.line}: {error.username or '-'}: {error.error}")
+    if report.errors_truncated:
+        print(f"... {report.failed - len(report.errors)} more errors")
+    print(f"Inserted {report.inserted} users, {report.failed} failed")
+    if report.failed:
+        sys.exit(1)
+
+
+def main() -> None:
+    """Entry point for the management command line."""
+    parser = argparse.ArgumentParser(description="FastAPI MongoDB management")
+    subparsers = parser.add_subparsers(required=True)
+
+    calibrate_parser = subparsers.add_parser(
+        "calibrate-argon2",
+        help="Pick argon2 cost parameters for a target verify latency",
+    )
+    calibrate_parser.add_argument(
+        "--target-ms", type=float, default=settings.ARGON2_TARGET_VERIFY_MS
+    )
+    calibrate_parser.add_argument("--parallelism", type=int, default=None)
+    calibrate_parser.add_argument("--samples", type=int, default=5)
+    calibrate_parser.set_defaults(func=calibrate_argon2)
+
+    indexes_parser = subparsers.add_parser(
+        "check-indexes",
+        help="Fail if a repository query would scan a whole collection",
+    )
+    indexes_parser.add_argument(
+        "--create", action="store_true", help="Create missing indexes first"
+    )
+    indexes_parser.set_defaults(func=check_indexes)
+
+    import_parser = subparsers.add_parser(
+        "import-users",
+        help="Import users from an NDJSON or CSV file",
+    )
+    import_parser.add_argument("path", type=Path)
+    import_parser.add_argument(
+        "--format",
+        choices=["ndjson", "csv"],
+        default=None,
+        help="Input format, guessed from the file extension by default",
+    )
+    import_parser.set_defaults(func=import_users_command)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import Any
+
+
+class TTLCache:
+    """Bounded in-memory cache with per-entry expiry and LRU eviction.
+
+    The cache is meant to be used from the event loop thread only. A
+    ``max_size`` of zero disables it: every lookup is a miss and nothing is
+    stored.
+
+    ``generation`` is bumped by every invalidation. A caller filling the cache
+    from a slow lookup reads it first and passes it to ``set``, which then
+    drops the value if an invalidation happened during the lookup, instead of
+    restoring data that was stale by the time it arrived.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.generation = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for ``key`` or ``default``.
+
+        Args:
+            key: The cache key.
+            default: Value returned on a miss.
+
+        Returns:
+            The cached value, or ``default`` if absent or expired.
+        """
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(
+        self,
+        key: Hashable,
+        value: Any,
+        ttl_seconds: float | None = None,
+        generation: int | None = None,
+    ) -> None:
+        """Store ``value`` under ``key``.
+
+        Args:
+            key: The cache key.
+            value: The value to cache.
+            ttl_seconds: Lifetime of this entry, defaults to the cache TTL.
+            generation: The ``generation`` read before loading ``value``; the
+                value is not stored if the cache was invalidated since.
+        """
+        if self.max_size <= 0:
+            return
+        if generation is not None and generation != self.generation:
+            return
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        if ttl <= 0:
+            return
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop ``key`` from the cache if present."""
+        self._data.pop(key, None)
+        self.generation += 1
+
+    def clear(self) -> None:
+        """Drop every entry and reset the counters."""
+        self._data.clear()
+        self.generation += 1
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def stats(self) -> dict[str, int]:
+        """Return the cache size and hit/miss/eviction counters."""
+        return {
+            "size": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,148 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable, Iterable, Mapping
+from typing import Any
+
+from core.metrics import coalesced_calls_total, lookup_batches_total
+
+
+class SingleFlight:
+    """Share one in-flight call between concurrent callers with the same key.
+
+    The call runs in its own task, so a cancelled caller never cancels it for
+    the others, and the key is forgotten as soon as the call finishes: results
+    are never served after the fact, only to callers that overlapped with it.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: dict[Hashable, asyncio.Future] = {}
+        self._coalesced_counter = coalesced_calls_total.labels(name)
+        self.calls = 0
+        self.coalesced = 0
+
+    async def do(
+        self, key: Hashable, func: Callable[..., Awaitable[Any]], *args: Any
+    ) -> Any:
+        """Run ``func(*args)`` unless a call for ``key`` is already running.
+
+        Args:
+            key: Identifies calls that can share a result.
+            func: The coroutine function to run.
+            *args: Positional arguments for ``func``.
+
+        Returns:
+            The result of the shared call.
+        """
+        self.calls += 1
+        future = self._calls.get(key)
+        if future is None:
+            future = asyncio.ensure_future(func(*args))
+            self._calls[key] = future
+            future.add_done_callback(lambda _: self._calls.pop(key, None))
+        else:
+            self.coalesced += 1
+            self._coalesced_counter.inc()
+        return await asyncio.shield(future)
+
+    def stats(self) -> dict[str, int]:
+        """Return the call counters and the number of calls in flight."""
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._calls),
+        }
+
+
+class BatchLoader:
+    """Collect distinct keys for a short window and load them in one call.
+
+    Keys requested while they are already queued or being loaded share that
+    load, like ``SingleFlight``. A batch is dispatched when the window closes
+    or when it reaches ``max_batch_size`` keys.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        load_many: Callable[[list[Any]], Awaitable[Mapping[Any, Any]]],
+        window_seconds: float,
+        max_batch_size: int,
+    ):
+        self.name = name
+        self.load_many = load_many
+        self.window_seconds = window_seconds
+        self.max_batch_size = max_batch_size
+        self._futures: dict[Hashable, asyncio.Future] = {}
+        self._batch: list[Hashable] = []
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+        self._coalesced_counter = coalesced_calls_total.labels(name)
+        self._batches_counter = lookup_batches_total.labels(name)
+        self.calls = 0
+        self.coalesced = 0
+        self.batches = 0
+        self.batched_keys = 0
+
+    async def load(self, key: Hashable) -> Any:
+        """Load ``key`` as part of the current batch.
+
+        Args:
+            key: The key to load.
+
+        Returns:
+            The value returned for ``key`` by ``load_many``, or None.
+        """
+        self.calls += 1
+        future = self._futures.get(key)
+        if future is not None:
+            self.coalesced += 1
+            self._coalesced_counter.inc()
+            return await asyncio.shield(future)
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._futures[key] = future
+        self._batch.append(key)
+        if len(self._batch) >= self.max_batch_size:
+            self._dispatch()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window_seconds, self._dispatch)
+        return await asyncio.shield(future)
+
+    def _dispatch(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        keys, self._batch = self._batch, []
+        if not keys:
+            return
+        self.batches += 1
+        self.batched_keys += len(keys)
+        self._batches_counter.inc()
+        task = asyncio.ensure_future(self._load(keys))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _load(self, keys: Iterable[Hashable]) -> None:
+        keys = list(keys)
+        futures = [self._futures.pop(key) for key in keys]
+        try:
+            results = await self.load_many(keys)
+        except Exception as err:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(err)
+                    # Mark it retrieved: every waiter may have been cancelled.
+                    future.exception()
+            return
+        for key, future in zip(keys, futures, strict=True):
+            if not future.done():
+                future.set_result(results.get(key))
+
+    def stats(self) -> dict[str, int]:
+        """Return the call and batch counters."""
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "batches": self.batches,
+            "batched_keys": self.batched_keys,
+        }
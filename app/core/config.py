@@ -1,4 +1,5 @@
 from pathlib import Path
+from typing import Literal
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -8,15 +9,113 @@ BASE_DIR = Path(__file__).resolve().parent.parent.parent
 class Settings(BaseSettings):
     # FastAPI Configuration
     SECRET_KEY: str = "your_secret_key"
-    JWT_ALGORITHM: str = "HS256"
+    JWT_ALGORITHM: str = "HS256"  # HS256, or EdDSA/ES256 with JWT_KEYS_DIR
+    JWT_KEYS_DIR: str | None = None
+    JWKS_MAX_AGE_SECONDS: int = 300
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 10080  # 7 days
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    JWT_DECODE_CACHE_MAX_SIZE: int = 10000  # 0 = disabled
+    AUTH_STATELESS_CLAIMS: bool = False
+    TOKEN_VERSION_CACHE_MAX_SIZE: int = 10000
+    TOKEN_VERSION_CACHE_TTL_SECONDS: float = 30.0
     LOG_LEVEL: str = "INFO"
     LOG_JSON_FORMAT: bool = True
+    LOG_QUEUE_ENABLED: bool = False
+    LOG_QUEUE_MAX_SIZE: int = 10000
+    LOG_QUEUE_DROP_POLICY: Literal["drop_new", "drop_oldest"] = "drop_new"
+    LOG_SAMPLE_RATE: float = 1.0  # fraction of requests logged
+    LOG_PATH_SAMPLE_RATES: dict[str, float] = {}  # path prefix -> sample rate
+    LOG_SLOW_REQUEST_MS: float = 1000.0  # always log slower requests
+    LOG_SINGLE_LINE: bool = False  # one completion record per request
+
+    # Administration
+    ADMIN_USERNAMES: list[str] = []  # users allowed on the /admin endpoints
+    USER_IMPORT_BATCH_SIZE: int = 1000
+    USER_IMPORT_HASH_WORKERS: int = 0  # 0 = this worker's share of the CPUs
+    USER_IMPORT_MAX_ERRORS: int = 1000  # row errors reported in detail
+    USER_IMPORT_MAX_LINE_BYTES: int = 65536
+
+    # Production server (app/server.py)
+    BACKEND_HOST: str = "0.0.0.0"
+    BACKEND_PORT: int = 8000
+    SERVER_WORKERS: int = 0  # 0 = one per available CPU
+    SERVER_LOOP: Literal["auto", "asyncio", "uvloop"] = "uvloop"
+    SERVER_HTTP: Literal["auto", "h11", "httptools"] = "httptools"
+    SERVER_BACKLOG: int = 2048
+    SERVER_KEEP_ALIVE_SECONDS: int = 5
+    SERVER_GRACEFUL_SHUTDOWN_SECONDS: int = 30
+    SERVER_FORWARDED_ALLOW_IPS: str | None = None  # trusted proxy addresses
+
+    # Admission control
+    ADMISSION_CONTROL_ENABLED: bool = True
+    # Route class -> max requests in flight, "default" for unmatched paths
+    ADMISSION_LIMITS: dict[str, int] = {"default": 512, "auth": 64, "admin": 1}
+    # Path prefix -> route class
+    ADMISSION_ROUTE_CLASSES: dict[str, str] = {
+        "/api/v1/auth/login": "auth",
+        "/api/v1/auth/register": "auth",
+        "/api/v1/me/change-password": "auth",
+        "/api/v1/admin": "admin",
+    }
+    ADMISSION_QUEUE_SIZE: int = 128  # waiting requests per route class
+    ADMISSION_QUEUE_TIMEOUT_MS: float = 500.0
+    ADMISSION_RETRY_AFTER_SECONDS: int = 1
+    MAX_REQUEST_BODY_BYTES: int = 1048576  # 0 = unlimited
+    # Path prefix -> body size limit overriding MAX_REQUEST_BODY_BYTES
+    PATH_MAX_REQUEST_BODY_BYTES: dict[str, int] = {"/api/v1/admin/users/import": 0}
+
+    # Metrics
+    METRICS_ENABLED: bool = False
+    METRICS_TOKEN: str | None = None  # bearer token required to scrape, if set
+    METRICS_MULTIPROCESS_DIR: str | None = None  # shared by all workers
+    METRICS_FLUSH_INTERVAL_SECONDS: float = 5.0
+
+    # Password hashing pool
+    PASSWORD_HASH_EXECUTOR: Literal["thread", "process"] = "thread"
+    PASSWORD_HASH_WORKERS: int = 0  # 0 = available CPUs / SERVER_WORKERS
+    PASSWORD_HASH_MAX_PENDING: int = 64
+    PASSWORD_HASH_TIMEOUT_SECONDS: float = 5.0
+
+    # Argon2 cost parameters
+    ARGON2_TIME_COST: int = 3
+    ARGON2_MEMORY_COST: int = 65536  # KiB
+    ARGON2_PARALLELISM: int = 4
+    ARGON2_CALIBRATE_ON_STARTUP: bool = False
+    ARGON2_TARGET_VERIFY_MS: float = 50.0
+
+    # Principal cache
+    USER_CACHE_MAX_SIZE: int = 10000  # 0 = disabled
+    USER_CACHE_TTL_SECONDS: float = 60.0
+    USER_LOOKUP_COALESCING: bool = True  # share concurrent identical lookups
+    USER_LOOKUP_BATCH_WINDOW_MS: float = 0.0  # 0 = no batching
+    USER_LOOKUP_MAX_BATCH_SIZE: int = 100
+
+    # Login and change password rate limits
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: Literal["memory", "mongodb"] = "memory"
+    RATE_LIMIT_MAX_KEYS: int = 100000  # memory backend, LRU evicted above
+    RATE_LIMIT_USERNAME_PER_MINUTE: float = 30.0
+    RATE_LIMIT_USERNAME_BURST: int = 20
+    RATE_LIMIT_USERNAME_IP_PER_MINUTE: float = 10.0
+    RATE_LIMIT_USERNAME_IP_BURST: int = 5
+    RATE_LIMIT_IP_PER_MINUTE: float = 60.0
+    RATE_LIMIT_IP_BURST: int = 20
 
     # MongoDB Configuration
     MONGO_INITDB_DATABASE: str
     ME_CONFIG_MONGODB_URL: str
+    MONGODB_SLOW_COMMAND_MS: float = 100.0  # log slower commands
+    # Client options, unset ones keep the connection string or driver default
+    MONGODB_MAX_POOL_SIZE: int | None = None
+    MONGODB_MIN_POOL_SIZE: int | None = None
+    MONGODB_MAX_IDLE_TIME_MS: int | None = None
+    MONGODB_WAIT_QUEUE_TIMEOUT_MS: int | None = None
+    MONGODB_SERVER_SELECTION_TIMEOUT_MS: int | None = None
+    MONGODB_COMPRESSORS: str | None = None  # e.g. zstd,snappy,zlib
+    MONGODB_APP_NAME: str = "fastapi-mongodb"
+    MONGODB_WARM_UP: bool = True
+    MONGODB_ENSURE_INDEXES: bool = True
+    MONGODB_VERIFY_QUERY_PLANS: bool = False  # fail startup on a COLLSCAN
 
     model_config = SettingsConfigDict(
         env_file=BASE_DIR / ".env",
@@ -0,0 +1,18 @@
+import os
+
+
+def available_cpus() -> int:
+    """Number of CPUs this process may run on, honouring affinity masks."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def worker_count(workers: int) -> int:
+    """Number of worker processes, one per available CPU when ``workers`` is 0."""
+    return workers if workers > 0 else available_cpus()
+
+
+def cpus_per_worker(workers: int) -> int:
+    """Share of the available CPUs of each of ``workers`` server workers."""
+    return max(1, available_cpus() // worker_count(workers))
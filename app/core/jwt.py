@@ -1,43 +1,103 @@
+import hashlib
+import time
 from datetime import UTC, datetime, timedelta
 from typing import Any
 
 import jwt
 
+from core.cache import TTLCache
 from core.config import settings
+from core.keyring import ASYMMETRIC_ALGORITHMS, keyring
+from core.metrics import jwt_operations_total
 
+# Verified access token payloads keyed by the SHA-256 digest of the token. Each
+# entry expires with its token's `exp`, so a cached payload is never served for
+# an expired token; anything else still goes through full signature checking.
+decoded_token_cache = TTLCache(
+    max_size=settings.JWT_DECODE_CACHE_MAX_SIZE,
+    ttl_seconds=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+)
 
-def create_access_token(data: dict):
+_encoded_tokens = jwt_operations_total.labels("encode", "ok")
+_decoded_tokens = jwt_operations_total.labels("decode", "ok")
+_cached_tokens = jwt_operations_total.labels("decode", "cached")
+_invalid_tokens = jwt_operations_total.labels("decode", "invalid")
+
+
+def encode_token(payload: dict[str, Any]) -> str:
+    """
+    Sign a payload with the shared secret or the active keyring key
+    """
+    _encoded_tokens.inc()
+    if settings.JWT_ALGORITHM in ASYMMETRIC_ALGORITHMS:
+        key = keyring.signing_key()
+        return jwt.encode(
+            payload,
+            key.private_key,
+            algorithm=key.algorithm,
+            headers={"kid": key.kid},
+        )
+    return jwt.encode(payload, settings.SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+
+
+def decode_token(token: str) -> dict[str, Any]:
+    """
+    Verify a token with the shared secret or the keyring key named by its `kid`
+    """
+    try:
+        if settings.JWT_ALGORITHM in ASYMMETRIC_ALGORITHMS:
+            key = keyring.verification_key(jwt.get_unverified_header(token).get("kid"))
+            if key is None:
+                raise jwt.InvalidTokenError("Unknown signing key")
+            payload = jwt.decode(token, key.public_key, algorithms=[key.algorithm])
+        else:
+            payload = jwt.decode(
+                token, settings.SECRET_KEY, algorithms=[settings.JWT_ALGORITHM]
+            )
+    except jwt.InvalidTokenError:
+        _invalid_tokens.inc()
+        raise
+    _decoded_tokens.inc()
+    return payload
+
+
+def remove_signing_key(kid: str) -> None:
+    """
+    Remove a signing key immediately and forget every payload verified with it
+    """
+    keyring.remove(kid=kid)
+    decoded_token_cache.clear()
+
+
+def create_access_token(data: dict[str, Any]) -> str:
     to_encode = data.copy()
     expire = datetime.now(UTC) + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({"exp": expire, "type": "access"})
-    encoded_jwt = jwt.encode(
-        to_encode,
-        settings.SECRET_KEY,
-        algorithm=settings.JWT_ALGORITHM,
-    )
-    return encoded_jwt
+    return encode_token(to_encode)
 
 
-def create_refresh_token(data: dict[str, str]) -> str:
+def create_refresh_token(data: dict[str, Any]) -> str:
     to_encode: dict[str, Any] = data.copy()
     expire = datetime.now(UTC) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
     to_encode.update({"exp": expire, "type": "refresh"})
-    encoded_jwt = jwt.encode(
-        to_encode,
-        settings.SECRET_KEY,
-        algorithm=settings.JWT_ALGORITHM,
-    )
-    return encoded_jwt
+    return encode_token(to_encode)
 
 
-def decode_access_token(token: str):
-    return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
+def decode_access_token(token: str) -> dict[str, Any]:
+    digest = hashlib.sha256(token.encode()).digest()
+    payload = decoded_token_cache.get(digest)
+    if payload is not None:
+        _cached_tokens.inc()
+    else:
+        payload = decode_token(token)
+        exp = payload.get("exp")
+        if isinstance(exp, int | float):
+            decoded_token_cache.set(digest, payload, ttl_seconds=exp - time.time())
+    return dict(payload)
 
 
 def verify_refresh_token(token: str) -> dict | None:
-    payload = jwt.decode(
-        token, settings.SECRET_KEY, algorithms=[settings.JWT_ALGORITHM]
-    )
+    payload = decode_token(token)
     if payload.get("type") != "refresh":
         return None
     return payload
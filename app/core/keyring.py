@@ -0,0 +1,218 @@
+import base64
+import hashlib
+import json
+import time
+from pathlib import Path
+from typing import Any
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+from jwt.algorithms import get_default_algorithms
+
+from core.config import settings
+from core.logger import get_logger
+
+logger = get_logger(name=__name__)
+
+ASYMMETRIC_ALGORITHMS = ("EdDSA", "ES256")
+
+# Members that identify a public key in its RFC 7638 thumbprint.
+_THUMBPRINT_MEMBERS = {"OKP": ("crv", "kty", "x"), "EC": ("crv", "kty", "x", "y")}
+
+PrivateKey = ed25519.Ed25519PrivateKey | ec.EllipticCurvePrivateKey
+
+# Key type each algorithm signs with, named as in error messages.
+_KEY_TYPES = {"EdDSA": "Ed25519", "ES256": "P-256 (secp256r1)"}
+
+
+def generate_private_key(algorithm: str) -> PrivateKey:
+    """
+    Generate a private key for the given JWT algorithm
+    """
+    if algorithm == "EdDSA":
+        return ed25519.Ed25519PrivateKey.generate()
+    if algorithm == "ES256":
+        return ec.generate_private_key(ec.SECP256R1())
+    raise ValueError(f"Unsupported asymmetric JWT algorithm: {algorithm}")
+
+
+def check_private_key(algorithm: str, private_key: object) -> PrivateKey:
+    """
+    Return the private key if it can sign tokens with the given JWT algorithm
+    """
+    if algorithm == "EdDSA" and isinstance(private_key, ed25519.Ed25519PrivateKey):
+        return private_key
+    if (
+        algorithm == "ES256"
+        and isinstance(private_key, ec.EllipticCurvePrivateKey)
+        and isinstance(private_key.curve, ec.SECP256R1)
+    ):
+        return private_key
+    if algorithm not in _KEY_TYPES:
+        raise ValueError(f"Unsupported asymmetric JWT algorithm: {algorithm}")
+    raise ValueError(
+        f"JWT_ALGORITHM {algorithm} needs {_KEY_TYPES[algorithm]} private keys"
+    )
+
+
+class SigningKey:
+    """A private key of the keyring together with its public JWK."""
+
+    def __init__(self, algorithm: str, private_key: PrivateKey):
+        self.algorithm = algorithm
+        self.private_key = private_key
+        self.public_key = private_key.public_key()
+        self.jwk: dict[str, Any] = get_default_algorithms()[algorithm].to_jwk(
+            self.public_key, as_dict=True
+        )
+        thumbprint_input = json.dumps(
+            {
+                member: self.jwk[member]
+                for member in _THUMBPRINT_MEMBERS[self.jwk["kty"]]
+            },
+            separators=(",", ":"),
+            sort_keys=True,
+        ).encode()
+        self.kid = (
+            base64.urlsafe_b64encode(hashlib.sha256(thumbprint_input).digest())
+            .rstrip(b"=")
+            .decode()
+        )
+        self.jwk.update(kid=self.kid, alg=algorithm, use="sig")
+        self.not_after: float | None = None
+
+
+class KeyRing:
+    """In-memory set of JWT signing keys with overlapping rotation windows.
+
+    Tokens are signed with the active key only. Rotating keeps the previous
+    key available for verification and in the JWKS for ``overlap_seconds``,
+    long enough for every token it signed to expire. Key ids are RFC 7638
+    thumbprints, so every worker loading the same key files agrees on them.
+    """
+
+    def __init__(self, algorithm: str, overlap_seconds: float):
+        self.algorithm = algorithm
+        self.overlap_seconds = overlap_seconds
+        self.keys: dict[str, SigningKey] = {}
+        self.active_kid: str | None = None
+        self._jwks: tuple[bytes, str] | None = None
+
+    def add_key(self, private_key: PrivateKey, activate: bool = True) -> SigningKey:
+        """Add a private key, optionally making it the active signing key.
+
+        Args:
+            private_key: An Ed25519 or P-256 private key.
+            activate: Whether new tokens should be signed with this key.
+
+        Returns:
+            The stored signing key.
+        """
+        key = SigningKey(algorithm=self.algorithm, private_key=private_key)
+        self.keys[key.kid] = key
+        if activate:
+            self._retire_active()
+            self.active_kid = key.kid
+        self._jwks = None
+        return key
+
+    def load_directory(self, directory: Path) -> None:
+        """Load every ``*.pem`` private key in ``directory``.
+
+        Files are loaded in name order and the last one becomes active, so
+        naming key files by creation date rotates them on the next start.
+
+        Raises:
+            ValueError: If the directory has no keys or a key does not match
+                the JWT algorithm.
+        """
+        paths = sorted(directory.glob("*.pem"))
+        if not paths:
+            raise ValueError(f"No *.pem private keys in JWT_KEYS_DIR {directory}")
+        for path in paths:
+            private_key = serialization.load_pem_private_key(
+                path.read_bytes(), password=None
+            )
+            try:
+                private_key = check_private_key(self.algorithm, private_key)
+            except ValueError as err:
+                raise ValueError(f"{path}: {err}") from err
+            self.add_key(private_key=private_key)
+
+    def rotate(self) -> SigningKey:
+        """Generate a new active key and start retiring the previous one."""
+        return self.add_key(private_key=generate_private_key(self.algorithm))
+
+    def remove(self, kid: str) -> None:
+        """Drop a key immediately, invalidating every token it signed."""
+        self.keys.pop(kid, None)
+        if self.active_kid == kid:
+            self.active_kid = None
+        self._jwks = None
+
+    def _retire_active(self) -> None:
+        if self.active_kid in self.keys:
+            self.keys[self.active_kid].not_after = time.time() + self.overlap_seconds
+
+    def _prune(self) -> None:
+        now = time.time()
+        expired = [
+            kid
+            for kid, key in self.keys.items()
+            if key.not_after is not None and key.not_after <= now
+        ]
+        for kid in expired:
+            self.remove(kid)
+
+    def _ensure_loaded(self) -> None:
+        if self.active_kid is not None:
+            return
+        if settings.JWT_KEYS_DIR:
+            self.load_directory(Path(settings.JWT_KEYS_DIR))
+        if self.active_kid is None:
+            logger.warning(
+                "No JWT signing keys configured, generating an ephemeral key. "
+                "Tokens will not verify across workers or restarts."
+            )
+            self.rotate()
+
+    def load(self) -> None:
+        """Load the signing keys now, so that bad key files fail at startup."""
+        self._ensure_loaded()
+
+    def signing_key(self) -> SigningKey:
+        """Return the active signing key, loading or generating it if needed."""
+        self._ensure_loaded()
+        return self.keys[self.active_kid]  # type: ignore[index]
+
+    def verification_key(self, kid: str | None) -> SigningKey | None:
+        """Return the key with id ``kid`` if it may still verify tokens."""
+        self._ensure_loaded()
+        self._prune()
+        return self.keys.get(kid) if kid else None
+
+    def jwks(self) -> tuple[bytes, str]:
+        """Return the serialized JWKS document and its ETag.
+
+        The document is rebuilt only when the set of keys changes.
+        """
+        if self.algorithm in ASYMMETRIC_ALGORITHMS:
+            self._ensure_loaded()
+        self._prune()
+        if self._jwks is None:
+            body = json.dumps(
+                {"keys": [key.jwk for key in self.keys.values()]},
+                separators=(",", ":"),
+            ).encode()
+            etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+            self._jwks = (body, etag)
+        return self._jwks
+
+
+keyring = KeyRing(
+    algorithm=settings.JWT_ALGORITHM,
+    overlap_seconds=max(
+        settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+        settings.REFRESH_TOKEN_EXPIRE_DAYS * 86400,
+    ),
+)
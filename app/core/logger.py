@@ -1,10 +1,19 @@
+import contextlib
+import copy
 import json
 import logging
 import logging.config
+import math
+import queue
+import random
 import sys
+from contextvars import ContextVar
 from datetime import UTC, datetime
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
-from typing import Any
+from typing import Any, Literal
+
+import orjson
 
 _EXTRA_LOG_FIELDS = (
     "request_id",
@@ -14,16 +23,166 @@ _EXTRA_LOG_FIELDS = (
     "query_params",
     "status_code",
     "duration_ms",
+    "command",
+    "collection",
+    "filter_shape",
+)
+
+
+def _dumps(data: dict[str, Any]) -> str:
+    """Serialize a log record dict, stringifying values JSON cannot represent."""
+    try:
+        return orjson.dumps(
+            data,
+            default=str,
+            option=orjson.OPT_PASSTHROUGH_DATETIME
+            | orjson.OPT_PASSTHROUGH_DATACLASS
+            | orjson.OPT_PASSTHROUGH_SUBCLASS,
+        ).decode()
+    except TypeError:
+        # orjson rejects some values outright, such as integers over 64 bits.
+        return json.dumps(data, default=str, ensure_ascii=False, separators=(",", ":"))
+
+
+# Whether the request being handled in this context was picked for logging.
+request_log_sampled: ContextVar[bool] = ContextVar("request_log_sampled", default=True)
+# ID of the request being handled in this context, for logs outside the middleware.
+current_request_id: ContextVar[str | None] = ContextVar(
+    "current_request_id", default=None
 )
 
 
+class RequestSampleFilter(logging.Filter):
+    """Drop sub-WARNING records emitted while handling an unsampled request.
+
+    Records logged outside a request, and every warning or error, always
+    pass. Handlers run their filters before formatting, so dropped records
+    are never serialized.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """Decide whether the record should be emitted.
+
+        Args:
+            record: The log record to check.
+
+        Returns:
+            True if the record should be emitted.
+        """
+        return record.levelno >= logging.WARNING or request_log_sampled.get()
+
+
+class RequestLogPolicy:
+    """Sampling policy for per-request log records.
+
+    Each request is sampled once, when it arrives, with the rate of the
+    longest matching path prefix (or the default rate). Completion records of
+    unsampled requests are still written for 4xx/5xx responses and for
+    requests slower than ``slow_request_ms``.
+    """
+
+    def __init__(self):
+        self.sample_rate = 1.0
+        self.path_sample_rates: list[tuple[str, float]] = []
+        self.slow_request_ms = 1000.0
+        self.single_line = False
+
+    def configure(
+        self,
+        sample_rate: float = 1.0,
+        path_sample_rates: dict[str, float] | None = None,
+        slow_request_ms: float = 1000.0,
+        single_line: bool = False,
+    ) -> None:
+        """Replace the sampling policy.
+
+        Args:
+            sample_rate: Fraction of requests logged when no path rate matches.
+            path_sample_rates: Sample rates keyed by path prefix.
+            slow_request_ms: Requests at least this slow are always logged.
+            single_line: Whether to write only the completion record.
+        """
+        self.sample_rate = sample_rate
+        self.path_sample_rates = sorted(
+            (path_sample_rates or {}).items(), key=lambda item: -len(item[0])
+        )
+        self.slow_request_ms = slow_request_ms
+        self.single_line = single_line
+
+    def sample(self, path: str) -> bool:
+        """Decide whether the request for ``path`` is logged.
+
+        Args:
+            path: The request path.
+
+        Returns:
+            True if the request was picked.
+        """
+        rate = self.sample_rate
+        for prefix, prefix_rate in self.path_sample_rates:
+            if path.startswith(prefix):
+                rate = prefix_rate
+                break
+        if rate >= 1:
+            return True
+        return rate > 0 and random.random() < rate
+
+    def log_completion(
+        self, sampled: bool, status_code: int, duration_ms: float
+    ) -> bool:
+        """Decide whether the completion record of a request is written.
+
+        Args:
+            sampled: The decision taken when the request arrived.
+            status_code: The response status code.
+            duration_ms: The request duration in milliseconds.
+
+        Returns:
+            True if the completion record should be written.
+        """
+        return sampled or status_code >= 400 or duration_ms >= self.slow_request_ms
+
+
+request_log_policy = RequestLogPolicy()
+
+
 class JsonFormatter(logging.Formatter):
     """Custom JSON formatter for structured logging.
 
     Formats log records as JSON objects with consistent structure including
     timestamp, level, logger name, module, line number, message and exceptions.
+
+    The timestamp is the record creation time; its second-granularity prefix is
+    cached, and records are serialized with orjson.
     """
 
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self._timestamp_prefix: tuple[int, str] = (-1, "")
+
+    def format_timestamp(self, created: float) -> str:
+        """Render ``created`` exactly like ``datetime.isoformat`` in UTC.
+
+        Args:
+            created: The record creation time in seconds since the epoch.
+
+        Returns:
+            ISO 8601 timestamp with microseconds and UTC offset.
+        """
+        fraction, whole = math.modf(created)
+        seconds = int(whole)
+        micros = round(fraction * 1_000_000)
+        if micros >= 1_000_000:
+            seconds += 1
+            micros -= 1_000_000
+        cached_seconds, prefix = self._timestamp_prefix
+        if cached_seconds != seconds:
+            prefix = datetime.fromtimestamp(seconds, UTC).strftime("%Y-%m-%dT%H:%M:%S")
+            self._timestamp_prefix = (seconds, prefix)
+        if micros:
+            return f"{prefix}.{micros:06d}+00:00"
+        return f"{prefix}+00:00"
+
     def format(self, record: logging.LogRecord) -> str:
         """Format the log record as a JSON string.
 
@@ -34,7 +193,7 @@ class JsonFormatter(logging.Formatter):
             JSON-formatted string with log information.
         """
         log_data: dict[str, Any] = {
-            "timestamp": datetime.now(UTC).isoformat(),
+            "timestamp": self.format_timestamp(record.created),
             "level": record.levelname,
             "logger": record.name,
             "module": record.module,
@@ -42,13 +201,89 @@ class JsonFormatter(logging.Formatter):
             "line": record.lineno,
             "message": record.getMessage(),
         }
-        if record.exc_info:
-            log_data["exception"] = self.formatException(record.exc_info)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            log_data["exception"] = record.exc_text
+        record_fields = record.__dict__
         for field in _EXTRA_LOG_FIELDS:
-            value = getattr(record, field, None)
+            value = record_fields.get(field)
             if value is not None:
                 log_data[field] = value
-        return json.dumps(log_data, default=str)
+        return _dumps(log_data)
+
+
+class DroppingQueueHandler(QueueHandler):
+    """Queue handler that never blocks the calling thread.
+
+    When the bounded queue is full the record is dropped according to the
+    drop policy (``drop_new`` discards the incoming record, ``drop_oldest``
+    makes room by discarding the oldest queued one) and counted.
+    """
+
+    def __init__(
+        self,
+        queue: queue.Queue,
+        drop_policy: Literal["drop_new", "drop_oldest"] = "drop_new",
+    ):
+        super().__init__(queue)
+        self.drop_policy = drop_policy
+        self.enqueued = 0
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Make the record safe to hand to the listener thread.
+
+        Only the message arguments are merged and the traceback rendered;
+        formatting itself is left to the listener's handlers.
+
+        Args:
+            record: The log record to prepare.
+
+        Returns:
+            A copy of the record without arguments or exception objects.
+        """
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = _exception_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        """Put the record on the queue, dropping a record if it is full.
+
+        Args:
+            record: The prepared log record.
+        """
+        try:
+            self.queue.put_nowait(record)
+            self.enqueued += 1
+            return
+        except queue.Full:
+            self.dropped += 1
+        if self.drop_policy == "drop_oldest":
+            with contextlib.suppress(queue.Empty, queue.Full):
+                self.queue.get_nowait()  # type: ignore
+                self.queue.put_nowait(record)
+                self.enqueued += 1
+
+
+class DrainingQueueListener(QueueListener):
+    """Queue listener whose stop waits for room to enqueue its sentinel."""
+
+    def enqueue_sentinel(self) -> None:
+        """Block until the sentinel fits, so stopping drains a full queue."""
+        self.queue.put(self._sentinel)  # type: ignore[attr-defined]
+
+
+_exception_formatter = logging.Formatter()
+_request_sample_filter = RequestSampleFilter()
+_queue_handlers: list[DroppingQueueHandler] = []
+_queue_listeners: list[QueueListener] = []
+_queue_listeners_running = False
 
 
 LOG_DIR = Path("/var/log/backend")
@@ -68,24 +303,32 @@ LOGGING_CONFIG = {
             "()": JsonFormatter,
         },
     },
+    "filters": {
+        "request_sample": {
+            "()": RequestSampleFilter,
+        },
+    },
     "handlers": {
         "console": {
             "class": "logging.StreamHandler",
             "level": "INFO",
             "formatter": "default",
             "stream": sys.stdout,
+            "filters": ["request_sample"],
         },
         "console_json": {
             "class": "logging.StreamHandler",
             "level": "DEBUG",
             "formatter": "json",
             "stream": sys.stdout,
+            "filters": ["request_sample"],
         },
         "file": {
             "class": "logging.handlers.RotatingFileHandler",
             "level": "INFO",
             "formatter": "json",
             "filename": str(LOG_DIR / "app.log"),
+            "filters": ["request_sample"],
             "maxBytes": 10485760,  # 10MB
             "backupCount": 5,
             "encoding": "utf-8",
@@ -95,6 +338,7 @@ LOGGING_CONFIG = {
             "level": "ERROR",
             "formatter": "json",
             "filename": str(LOG_DIR / "error.log"),
+            "filters": ["request_sample"],
             "maxBytes": 10485760,  # 10MB
             "backupCount": 5,
             "encoding": "utf-8",
@@ -143,13 +387,26 @@ LOGGING_CONFIG = {
 }
 
 
-def setup_logging(log_level: str = "INFO", use_json: bool = False) -> None:
+def setup_logging(
+    log_level: str = "INFO",
+    use_json: bool = False,
+    use_queue: bool = False,
+    queue_size: int = 10000,
+    drop_policy: Literal["drop_new", "drop_oldest"] = "drop_new",
+) -> None:
     """Configure logging for the application.
 
     Args:
         log_level: The minimum log level to capture (DEBUG, INFO, WARNING, ERROR, CRITICAL).
         use_json: Whether to use JSON formatting for console output.
+        use_queue: Whether to hand records to background listener threads that
+            own the formatters, streams and files instead of writing inline.
+        queue_size: Maximum number of records waiting in each queue.
+        drop_policy: What to drop when a queue is full (drop_new, drop_oldest).
     """
+    stop_logging_queue()
+    _queue_handlers.clear()
+    _queue_listeners.clear()
     LOGGING_CONFIG["loggers"][""]["level"] = log_level
     LOGGING_CONFIG["loggers"]["app"]["level"] = log_level
     if use_json:
@@ -161,6 +418,67 @@ def setup_logging(log_level: str = "INFO", use_json: bool = False) -> None:
     else:
         LOGGING_CONFIG["loggers"][""]["handlers"] = ["console", "file", "error_file"]
     logging.config.dictConfig(config=LOGGING_CONFIG)
+    if use_queue:
+        _install_queue_handlers(queue_size=queue_size, drop_policy=drop_policy)
+        start_logging_queue()
+
+
+def _install_queue_handlers(
+    queue_size: int, drop_policy: Literal["drop_new", "drop_oldest"]
+) -> None:
+    """Move the configured handlers behind one queue per distinct handler set."""
+    groups: dict[tuple[int, ...], list[logging.Logger]] = {}
+    for name in LOGGING_CONFIG["loggers"]:
+        logger = logging.getLogger(name=name)
+        if logger.handlers:
+            key = tuple(id(handler) for handler in logger.handlers)
+            groups.setdefault(key, []).append(logger)
+    for loggers in groups.values():
+        log_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        queue_handler = DroppingQueueHandler(queue=log_queue, drop_policy=drop_policy)
+        # Sample in the logging thread, where the request context is visible.
+        queue_handler.addFilter(_request_sample_filter)
+        _queue_listeners.append(
+            DrainingQueueListener(
+                log_queue, *loggers[0].handlers, respect_handler_level=True
+            )
+        )
+        _queue_handlers.append(queue_handler)
+        for logger in loggers:
+            logger.handlers = [queue_handler]
+
+
+def start_logging_queue() -> None:
+    """Start the queue listener threads if queue mode is enabled."""
+    global _queue_listeners_running
+    if _queue_listeners_running:
+        return
+    for listener in _queue_listeners:
+        listener.start()
+    _queue_listeners_running = bool(_queue_listeners)
+
+
+def stop_logging_queue() -> None:
+    """Flush every queued record and stop the listener threads."""
+    global _queue_listeners_running
+    if not _queue_listeners_running:
+        return
+    for listener in _queue_listeners:
+        listener.stop()
+    _queue_listeners_running = False
+
+
+def get_logging_queue_stats() -> dict[str, int]:
+    """Return the queue depth and the enqueued/dropped record counters.
+
+    Returns:
+        Totals across every logging queue.
+    """
+    return {
+        "queued": sum(handler.queue.qsize() for handler in _queue_handlers),  # type: ignore[union-attr]
+        "enqueued": sum(handler.enqueued for handler in _queue_handlers),
+        "dropped": sum(handler.dropped for handler in _queue_handlers),
+    }
 
 
 def get_logger(name: str) -> logging.Logger:
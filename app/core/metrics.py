@@ -0,0 +1,381 @@
+import asyncio
+import bisect
+import contextlib
+import json
+import os
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Coroutine, Iterable
+from functools import wraps
+from pathlib import Path
+from typing import Any, ParamSpec, TypeVar
+
+from core.config import settings
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class CounterChild:
+    """A monotonically increasing value for one set of label values."""
+
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: float = 1) -> None:
+        """Increase the counter by ``amount``."""
+        self.value += amount
+
+
+class HistogramChild:
+    """Bucketed observations for one set of label values.
+
+    Bucket counts are stored non-cumulatively so an observation touches a
+    single slot; they are accumulated when the metrics are rendered.
+    """
+
+    __slots__ = ("upper_bounds", "bucket_counts", "sum", "count")
+
+    def __init__(self, upper_bounds: tuple[float, ...]):
+        self.upper_bounds = upper_bounds
+        self.bucket_counts = [0] * (len(upper_bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        """Record one observation."""
+        self.bucket_counts[bisect.bisect_left(self.upper_bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Metric(ABC):
+    """A named metric family whose children are keyed by label values."""
+
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...]):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.children: dict[tuple[str, ...], Any] = {}
+
+    @abstractmethod
+    def _new_child(self) -> Any:
+        """Create the child holding the samples of one label set."""
+
+    @abstractmethod
+    def _child_state(self, child: Any) -> Any:
+        """Return the JSON-serializable state of a child for snapshots."""
+
+    def labels(self, *values: str) -> Any:
+        """Return the child for ``values``, creating it on first use.
+
+        Callers on hot paths should resolve their children once and keep them.
+        """
+        child = self.children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(
+                    f"{self.name} expects labels {self.labelnames}, got {values}"
+                )
+            child = self.children[values] = self._new_child()
+        return child
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return a JSON-serializable copy of the metric and its children."""
+        return {
+            "type": self.type,
+            "help": self.documentation,
+            "labelnames": list(self.labelnames),
+            "samples": [
+                [list(values), self._child_state(child)]
+                for values, child in list(self.children.items())
+            ],
+        }
+
+
+M = TypeVar("M", bound=Metric)
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def _new_child(self) -> CounterChild:
+        return CounterChild()
+
+    def _child_state(self, child: CounterChild) -> float:
+        return child.value
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...],
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self) -> HistogramChild:
+        return HistogramChild(upper_bounds=self.buckets)
+
+    def _child_state(self, child: HistogramChild) -> list[Any]:
+        return [list(child.bucket_counts), child.sum, child.count]
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return a JSON-serializable copy of the metric and its children."""
+        return {**super().snapshot(), "buckets": list(self.buckets)}
+
+
+class MetricsRegistry:
+    """In-process metrics rendered in the Prometheus text format.
+
+    Metrics are updated from the event loop thread without locks. With
+    ``multiprocess_dir`` set, every worker writes a snapshot of its metrics to
+    ``<multiprocess_dir>/<pid>.json`` and a scrape served by any worker sums
+    the snapshots of all of them. The directory must be emptied before the
+    workers start.
+    """
+
+    def __init__(self, multiprocess_dir: str | None = None):
+        self.metrics: dict[str, Metric] = {}
+        self.multiprocess_dir = Path(multiprocess_dir) if multiprocess_dir else None
+
+    def counter(
+        self, name: str, documentation: str, labelnames: tuple[str, ...] = ()
+    ) -> Counter:
+        """Register a counter."""
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        """Register a histogram."""
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def _register(self, metric: M) -> M:
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return a JSON-serializable copy of every metric."""
+        return {name: metric.snapshot() for name, metric in self.metrics.items()}
+
+    def reset(self) -> None:
+        """Drop every recorded value."""
+        for metric in self.metrics.values():
+            metric.children.clear()
+
+    def write_snapshot(self, snapshot: dict[str, Any]) -> None:
+        """Atomically write this worker's snapshot to the multiprocess directory.
+
+        Args:
+            snapshot: A snapshot taken with ``snapshot``.
+        """
+        if self.multiprocess_dir is None:
+            return
+        self.multiprocess_dir.mkdir(parents=True, exist_ok=True)
+        path = self.multiprocess_dir / f"{os.getpid()}.json"
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(snapshot, separators=(",", ":")))
+        os.replace(tmp_path, path)
+
+    def collect(self, snapshot: dict[str, Any]) -> bytes:
+        """Render this worker's snapshot, merged with the other workers'.
+
+        Args:
+            snapshot: A snapshot taken with ``snapshot``.
+
+        Returns:
+            The metrics in the Prometheus text exposition format.
+        """
+        if self.multiprocess_dir is None:
+            return render([snapshot])
+        self.write_snapshot(snapshot)
+        snapshots = []
+        for path in sorted(self.multiprocess_dir.glob("*.json")):
+            # A worker may replace its file while it is being read.
+            with contextlib.suppress(FileNotFoundError, json.JSONDecodeError):
+                snapshots.append(json.loads(path.read_text()))
+        return render(snapshots)
+
+    async def flush_periodically(self, interval_seconds: float) -> None:
+        """Write this worker's snapshot every ``interval_seconds`` until cancelled."""
+        if self.multiprocess_dir is None:
+            return
+        while True:
+            await asyncio.sleep(interval_seconds)
+            await asyncio.to_thread(self.write_snapshot, self.snapshot())
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labelnames: Iterable[str], values: Iterable[str]) -> str:
+    pairs = ",".join(
+        f'{name}="{_escape(value)}"'
+        for name, value in zip(labelnames, values, strict=True)
+    )
+    return f"{{{pairs}}}" if pairs else ""
+
+
+def _merge_state(metric_type: str, total: Any, state: Any) -> Any:
+    if metric_type == "histogram":
+        bucket_counts = [a + b for a, b in zip(total[0], state[0], strict=True)]
+        return [bucket_counts, total[1] + state[1], total[2] + state[2]]
+    return total + state
+
+
+def render(snapshots: Iterable[dict[str, Any]]) -> bytes:
+    """Sum metric snapshots and render them in the Prometheus text format.
+
+    Args:
+        snapshots: Snapshots taken with ``MetricsRegistry.snapshot``.
+
+    Returns:
+        The exposition as UTF-8 bytes.
+    """
+    merged: dict[str, dict[str, Any]] = {}
+    for snapshot in snapshots:
+        for name, metric in snapshot.items():
+            target = merged.setdefault(name, {**metric, "samples": {}})
+            for values, state in metric["samples"]:
+                key = tuple(values)
+                previous = target["samples"].get(key)
+                target["samples"][key] = (
+                    state
+                    if previous is None
+                    else _merge_state(metric["type"], previous, state)
+                )
+    lines = []
+    for name, metric in merged.items():
+        lines.append(f"# HELP {name} {metric['help']}")
+        lines.append(f"# TYPE {name} {metric['type']}")
+        labelnames = metric["labelnames"]
+        for values, state in metric["samples"].items():
+            if metric["type"] != "histogram":
+                lines.append(f"{name}{_format_labels(labelnames, values)} {state}")
+                continue
+            bucket_counts, total, count = state
+            cumulative = 0
+            for upper_bound, bucket_count in zip(
+                [*metric["buckets"], "+Inf"], bucket_counts, strict=True
+            ):
+                cumulative += bucket_count
+                labels = _format_labels(
+                    [*labelnames, "le"], [*values, str(upper_bound)]
+                )
+                lines.append(f"{name}_bucket{labels} {cumulative}")
+            labels = _format_labels(labelnames, values)
+            lines.append(f"{name}_sum{labels} {total}")
+            lines.append(f"{name}_count{labels} {count}")
+    return ("\n".join(lines) + "\n").encode()
+
+
+def timed(
+    histogram: Histogram, *label_values: str
+) -> Callable[
+    [Callable[P, Coroutine[Any, Any, R]]], Callable[P, Coroutine[Any, Any, R]]
+]:
+    """Decorate a coroutine function to observe its duration in ``histogram``.
+
+    The histogram child is resolved once, when the function is decorated.
+    """
+    child = histogram.labels(*label_values)
+
+    def decorator(
+        func: Callable[P, Coroutine[Any, Any, R]],
+    ) -> Callable[P, Coroutine[Any, Any, R]]:
+        @wraps(func)
+        async def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+            start = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                child.observe(time.perf_counter() - start)
+
+        return wrapper
+
+    return decorator
+
+
+registry = MetricsRegistry(multiprocess_dir=settings.METRICS_MULTIPROCESS_DIR)
+
+http_requests_total = registry.counter(
+    "http_requests_total",
+    "HTTP requests by method, route template and status code",
+    ("method", "route", "status"),
+)
+http_request_duration_seconds = registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request duration by method and route template",
+    ("method", "route"),
+)
+password_hash_duration_seconds = registry.histogram(
+    "password_hash_duration_seconds",
+    "Argon2 hash and verify duration, including queueing on the pool",
+    ("operation",),
+)
+jwt_operations_total = registry.counter(
+    "jwt_operations_total",
+    "JWT encode and decode operations by result",
+    ("operation", "result"),
+)
+mongodb_operation_duration_seconds = registry.histogram(
+    "mongodb_operation_duration_seconds",
+    "MongoDB repository operation duration",
+    ("collection", "operation"),
+)
+coalesced_calls_total = registry.counter(
+    "coalesced_calls_total",
+    "Calls that shared an in-flight or batched lookup instead of issuing one",
+    ("name",),
+)
+lookup_batches_total = registry.counter(
+    "lookup_batches_total",
+    "Batched lookups dispatched",
+    ("name",),
+)
+rate_limited_total = registry.counter(
+    "rate_limited_total",
+    "Attempts rejected by a rate limit, by action and bucket scope",
+    ("action", "scope"),
+)
+admission_requests_total = registry.counter(
+    "admission_requests_total",
+    "Admission control decisions by route class: admitted, queued, "
+    "queue_full, queue_timeout and body_too_large",
+    ("route_class", "result"),
+)
@@ -0,0 +1,92 @@
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Awaitable, Hashable
+
+
+class Rate:
+    """A token bucket refilled at ``per_minute`` tokens that holds ``burst``.
+
+    Buckets are tracked with the generic cell rate algorithm, which is
+    equivalent to a token bucket but stores a single timestamp per key: the
+    theoretical arrival time (TAT) of the next request. A request is allowed
+    when the TAT is no further ahead of now than the burst tolerance, and
+    each allowed request pushes the TAT forward by one emission interval.
+    """
+
+    __slots__ = ("per_minute", "burst", "interval", "tolerance")
+
+    def __init__(self, per_minute: float, burst: int):
+        if per_minute <= 0 or burst < 1:
+            raise ValueError("per_minute must be positive and burst at least 1")
+        self.per_minute = per_minute
+        self.burst = burst
+        self.interval = 60 / per_minute
+        self.tolerance = (burst - 1) * self.interval
+
+    def __repr__(self) -> str:
+        return f"Rate(per_minute={self.per_minute}, burst={self.burst})"
+
+
+class RateLimitStore(ABC):
+    """Storage for the TAT of every rate limited key."""
+
+    @abstractmethod
+    def hit(self, key: str, rate: Rate) -> Awaitable[float]:
+        """Take one token from the bucket of ``key``.
+
+        Args:
+            key: The bucket key, e.g. ``login:ip:203.0.113.7``.
+            rate: The rate of the bucket.
+
+        Returns:
+            Zero if the request is allowed, otherwise the seconds to wait
+            before the next one would be.
+        """
+
+
+class MemoryRateLimitStore(RateLimitStore):
+    """Per-process buckets with LRU eviction above ``max_keys``.
+
+    Each key costs one float. A key whose TAT is in the past holds a full
+    bucket, which is the same as not being stored, so evicting idle keys
+    first loses nothing. Under a flood of distinct keys the oldest buckets
+    are evicted and start full again. Use it from the event loop thread only.
+    """
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._tats: OrderedDict[Hashable, float] = OrderedDict()
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._tats)
+
+    async def hit(self, key: str, rate: Rate) -> float:
+        """Take one token from the bucket of ``key``.
+
+        Args:
+            key: The bucket key.
+            rate: The rate of the bucket.
+
+        Returns:
+            Zero if allowed, otherwise the seconds until a token is available.
+        """
+        now = time.monotonic()
+        tat = max(self._tats.get(key, now), now)
+        wait = tat - now - rate.tolerance
+        if wait > 0:
+            # Keep limited keys recent so a flood cannot evict them.
+            self._tats.move_to_end(key)
+            return wait
+        self._tats[key] = tat + rate.interval
+        self._tats.move_to_end(key)
+        while len(self._tats) > self.max_keys:
+            self._tats.popitem(last=False)
+            self.evictions += 1
+        return 0.0
+
+    def clear(self) -> None:
+        """Drop every bucket and reset the eviction counter."""
+        self._tats.clear()
+        self.evictions = 0
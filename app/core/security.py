@@ -1,6 +1,59 @@
+import asyncio
+import statistics
+import time
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any
+
 from pwdlib import PasswordHash
+from pwdlib.hashers.argon2 import Argon2Hasher
+
+from core.config import settings
+from core.cpu import cpus_per_worker
+from core.metrics import password_hash_duration_seconds
+
+# Lower bound for calibration, the OWASP minimum for argon2id (19 MiB).
+MIN_ARGON2_MEMORY_COST = 19456
+
+
+def build_password_hash(
+    time_cost: int, memory_cost: int, parallelism: int
+) -> PasswordHash:
+    """
+    Build an argon2 password hasher with the given cost parameters
+    """
+    return PasswordHash(
+        (
+            Argon2Hasher(
+                time_cost=time_cost,
+                memory_cost=memory_cost,
+                parallelism=parallelism,
+            ),
+        )
+    )
+
 
-password_hash = PasswordHash.recommended()
+password_hash_params = {
+    "time_cost": settings.ARGON2_TIME_COST,
+    "memory_cost": settings.ARGON2_MEMORY_COST,
+    "parallelism": settings.ARGON2_PARALLELISM,
+}
+password_hash = build_password_hash(**password_hash_params)
+
+
+def configure_password_hash(time_cost: int, memory_cost: int, parallelism: int) -> None:
+    """
+    Replace the argon2 cost parameters used by this process
+    """
+    global password_hash
+    password_hash_params.update(
+        time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism
+    )
+    password_hash = build_password_hash(**password_hash_params)
+
+
+class PasswordHashUnavailableError(Exception):
+    """Raised when the password hashing pool is saturated or too slow."""
 
 
 def get_password_hash(password: str) -> str:
@@ -10,8 +63,214 @@ def get_password_hash(password: str) -> str:
     return password_hash.hash(password=password)
 
 
+def get_password_hashes(passwords: list[str]) -> list[str]:
+    """
+    Hash several passwords in one call, to amortize the cost of a job on a
+    process pool
+    """
+    return [password_hash.hash(password=password) for password in passwords]
+
+
 def verify_password(plain_password, hashed_password):
     """
     Verify a password against a hashed password
     """
     return password_hash.verify(password=plain_password, hash=hashed_password)
+
+
+def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    """
+    Verify a password and return a new hash if the stored one uses stale parameters
+    """
+    return password_hash.verify_and_update(
+        password=plain_password, hash=hashed_password
+    )
+
+
+def _measure_verify_ms(hasher: PasswordHash, samples: int) -> float:
+    hashed = hasher.hash("calibration-password")
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        hasher.verify("calibration-password", hashed)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def calibrate_password_hash(
+    target_ms: float, parallelism: int | None = None, samples: int = 5
+) -> dict[str, float]:
+    """Pick argon2 cost parameters that hit a target verify latency.
+
+    Memory cost starts at the configured value and is halved (down to
+    ``MIN_ARGON2_MEMORY_COST``) while a single pass is already slower than the
+    target; time cost is then raised as far as the target allows.
+
+    Args:
+        target_ms: Desired median verify latency in milliseconds.
+        parallelism: Argon2 lanes, defaults to ``ARGON2_PARALLELISM``.
+        samples: Number of verifications measured per candidate.
+
+    Returns:
+        The chosen ``time_cost``, ``memory_cost`` and ``parallelism`` plus the
+        measured median ``verify_ms``.
+    """
+    parallelism = parallelism or settings.ARGON2_PARALLELISM
+    memory_cost = settings.ARGON2_MEMORY_COST
+    single_pass_ms = _measure_verify_ms(
+        build_password_hash(1, memory_cost, parallelism), samples
+    )
+    while single_pass_ms > target_ms and memory_cost // 2 >= MIN_ARGON2_MEMORY_COST:
+        memory_cost //= 2
+        single_pass_ms = _measure_verify_ms(
+            build_password_hash(1, memory_cost, parallelism), samples
+        )
+    time_cost = max(1, int(target_ms // single_pass_ms))
+    verify_ms = _measure_verify_ms(
+        build_password_hash(time_cost, memory_cost, parallelism), samples
+    )
+    while time_cost > 1 and verify_ms > target_ms:
+        time_cost -= 1
+        verify_ms = _measure_verify_ms(
+            build_password_hash(time_cost, memory_cost, parallelism), samples
+        )
+    return {
+        "time_cost": time_cost,
+        "memory_cost": memory_cost,
+        "parallelism": parallelism,
+        "verify_ms": round(verify_ms, 2),
+    }
+
+
+class PasswordHashPool:
+    """Bounded worker pool that runs argon2 hashing off the event loop.
+
+    Work is rejected with ``PasswordHashUnavailableError`` when more than
+    ``PASSWORD_HASH_MAX_PENDING`` jobs are queued or running, or when a job
+    does not finish within ``PASSWORD_HASH_TIMEOUT_SECONDS``.
+    """
+
+    def __init__(self):
+        self.executor: Executor | None = None
+        self.pending = 0
+        self.stats: dict[str, float] = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "rejected": 0,
+            "timed_out": 0,
+            "seconds_total": 0.0,
+        }
+
+    def start(self) -> None:
+        """Create the executor configured in settings."""
+        if self.executor is not None:
+            return
+        workers = settings.PASSWORD_HASH_WORKERS or cpus_per_worker(
+            settings.SERVER_WORKERS
+        )
+        if settings.PASSWORD_HASH_EXECUTOR == "process":
+            self.executor = ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=configure_password_hash,
+                initargs=(
+                    password_hash_params["time_cost"],
+                    password_hash_params["memory_cost"],
+                    password_hash_params["parallelism"],
+                ),
+            )
+        else:
+            self.executor = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="password-hash"
+            )
+
+    def shutdown(self) -> None:
+        """Shut down the executor, dropping queued work."""
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+            self.executor = None
+
+    def _release(self, _: asyncio.Future) -> None:
+        self.pending -= 1
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run ``func`` on the pool and await its result.
+
+        Args:
+            func: A picklable module-level callable.
+            *args: Positional arguments for ``func``.
+
+        Returns:
+            The value returned by ``func``.
+
+        Raises:
+            PasswordHashUnavailableError: If the pool is saturated or the
+                job exceeds the configured timeout.
+        """
+        if self.pending >= settings.PASSWORD_HASH_MAX_PENDING:
+            self.stats["rejected"] += 1
+            raise PasswordHashUnavailableError("Password hashing pool is saturated")
+        self.start()
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self.executor, func, *args)
+        # The slot is released when the job actually finishes, so timed out
+        # jobs still count against the queue depth while they occupy a worker.
+        self.pending += 1
+        self.stats["submitted"] += 1
+        future.add_done_callback(self._release)
+        start = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(
+                asyncio.shield(future),
+                timeout=settings.PASSWORD_HASH_TIMEOUT_SECONDS,
+            )
+        except TimeoutError as err:
+            self.stats["timed_out"] += 1
+            raise PasswordHashUnavailableError("Password hashing timed out") from err
+        except Exception:
+            self.stats["failed"] += 1
+            raise
+        elapsed = time.perf_counter() - start
+        self.stats["completed"] += 1
+        self.stats["seconds_total"] += elapsed
+        _password_hash_durations.get(func, _other_durations).observe(elapsed)
+        return result
+
+
+password_hash_pool = PasswordHashPool()
+
+_password_hash_durations = {
+    get_password_hash: password_hash_duration_seconds.labels("hash"),
+    verify_password: password_hash_duration_seconds.labels("verify"),
+    verify_and_update_password: password_hash_duration_seconds.labels("verify"),
+}
+_other_durations = password_hash_duration_seconds.labels("other")
+
+
+async def hash_password_async(password: str) -> str:
+    """
+    Hash a password on the password hashing pool
+    """
+    return await password_hash_pool.run(get_password_hash, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verify a password against a hashed password on the password hashing pool
+    """
+    return await password_hash_pool.run(
+        verify_password, plain_password, hashed_password
+    )
+
+
+async def verify_and_update_password_async(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    """
+    Verify a password and compute a rehash if needed on the password hashing pool
+    """
+    return await password_hash_pool.run(
+        verify_and_update_password, plain_password, hashed_password
+    )
@@ -17,7 +17,8 @@ db.createUser({
 });
 
 // Create indexes
-// Users collection indexes
+// Users collection indexes, also created by the application at startup
+// (app/repositories/indexes.py)
 db.users.createIndex(
     { username: 1 },
     { unique: true, name: "username_unique_idx" }
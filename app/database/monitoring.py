@@ -0,0 +1,240 @@
+import threading
+from collections.abc import Mapping
+from typing import Any
+
+from core.config import settings
+from core.logger import current_request_id, get_logger
+from pymongo import monitoring
+
+logger = get_logger(name=__name__)
+
+# Where each command keeps the filter of the documents it touches.
+_FILTER_FIELDS = {
+    "find": "filter",
+    "count": "query",
+    "distinct": "query",
+    "findAndModify": "query",
+    "aggregate": "pipeline",
+}
+_BULK_FILTER_FIELDS = {"update": "updates", "delete": "deletes"}
+
+
+def query_shape(value: Any) -> Any:
+    """
+    Replace the values of a filter with "?", keeping its fields and operators
+    """
+    if isinstance(value, Mapping):
+        return {key: query_shape(item) for key, item in value.items()}
+    if isinstance(value, list | tuple) and any(
+        isinstance(item, Mapping) for item in value
+    ):
+        return [query_shape(item) for item in value]
+    return "?"
+
+
+def command_filter(command_name: str, command: Mapping[str, Any]) -> Any:
+    """
+    Return the filter of a command, or None for commands without one
+    """
+    if command_name in _FILTER_FIELDS:
+        return command.get(_FILTER_FIELDS[command_name])
+    if command_name in _BULK_FILTER_FIELDS:
+        statements = command.get(_BULK_FILTER_FIELDS[command_name]) or ()
+        return statements[0].get("q") if statements else None
+    return None
+
+
+class CommandMonitor(monitoring.CommandListener):
+    """Record per-command durations and log slow commands.
+
+    Listeners are called synchronously by the driver, on the event loop thread
+    with the async client. The counters are still guarded by an uncontended
+    lock so the listener stays safe with a threaded client. The request ID is
+    read from the context when a command starts; commands are only rendered
+    into a log record when they exceed ``slow_command_ms``.
+    """
+
+    def __init__(self, slow_command_ms: float):
+        self.slow_command_ms = slow_command_ms
+        self._lock = threading.Lock()
+        self._pending: dict[tuple[Any, int], tuple[Any, str | None, Any]] = {}
+        self._commands: dict[str, dict[str, float]] = {}
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        """Remember the command until it finishes.
+
+        Args:
+            event: The command started event.
+        """
+        collection = event.command.get(event.command_name)
+        with self._lock:
+            self._pending[(event.connection_id, event.request_id)] = (
+                collection if isinstance(collection, str) else None,
+                current_request_id.get(),
+                command_filter(event.command_name, event.command),
+            )
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        """Record a successful command.
+
+        Args:
+            event: The command succeeded event.
+        """
+        self._finish(event, failed=False)
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        """Record a failed command.
+
+        Args:
+            event: The command failed event.
+        """
+        self._finish(event, failed=True)
+
+    def _finish(
+        self,
+        event: monitoring.CommandSucceededEvent | monitoring.CommandFailedEvent,
+        failed: bool,
+    ) -> None:
+        seconds = event.duration_micros / 1_000_000
+        slow = seconds * 1000 >= self.slow_command_ms
+        with self._lock:
+            pending = self._pending.pop((event.connection_id, event.request_id), None)
+            stats = self._commands.get(event.command_name)
+            if stats is None:
+                stats = self._commands[event.command_name] = {
+                    "count": 0,
+                    "failed": 0,
+                    "slow": 0,
+                    "seconds_total": 0.0,
+                    "seconds_max": 0.0,
+                }
+            stats["count"] += 1
+            stats["failed"] += failed
+            stats["slow"] += slow
+            stats["seconds_total"] += seconds
+            stats["seconds_max"] = max(stats["seconds_max"], seconds)
+        if slow:
+            collection, request_id, command_filter_value = pending or (None, None, None)
+            logger.warning(
+                f"Slow MongoDB command: {event.command_name} {collection} - "
+                f"{seconds * 1000:.2f} ms",
+                extra={
+                    "request_id": request_id,
+                    "command": event.command_name,
+                    "collection": collection,
+                    "filter_shape": query_shape(command_filter_value)
+                    if command_filter_value is not None
+                    else None,
+                    "duration_ms": round(seconds * 1000, 2),
+                },
+            )
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        """Return the counters and durations of every command name seen."""
+        with self._lock:
+            return {name: dict(stats) for name, stats in self._commands.items()}
+
+    def reset(self) -> None:
+        """Drop every recorded value."""
+        with self._lock:
+            self._pending.clear()
+            self._commands.clear()
+
+
+class PoolMonitor(monitoring.ConnectionPoolListener):
+    """Record connection pool checkout waits and connection churn."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: dict[str, float] = {}
+        self.reset()
+
+    def _add(self, name: str, amount: float = 1) -> None:
+        with self._lock:
+            self._stats[name] += amount
+
+    def pool_created(self, event: monitoring.PoolCreatedEvent) -> None:
+        """Count a created pool."""
+        self._add("pools_created")
+
+    def pool_ready(self, event: monitoring.PoolReadyEvent) -> None:
+        """Pools becoming ready are not recorded."""
+
+    def pool_cleared(self, event: monitoring.PoolClearedEvent) -> None:
+        """Count a cleared pool, usually after a network error or failover."""
+        self._add("pools_cleared")
+
+    def pool_closed(self, event: monitoring.PoolClosedEvent) -> None:
+        """Pools closing are not recorded."""
+
+    def connection_created(self, event: monitoring.ConnectionCreatedEvent) -> None:
+        """Count a new connection."""
+        self._add("connections_created")
+
+    def connection_ready(self, event: monitoring.ConnectionReadyEvent) -> None:
+        """Connections becoming ready are not recorded."""
+
+    def connection_closed(self, event: monitoring.ConnectionClosedEvent) -> None:
+        """Count a closed connection."""
+        self._add("connections_closed")
+
+    def connection_check_out_started(
+        self, event: monitoring.ConnectionCheckOutStartedEvent
+    ) -> None:
+        """Checkout starts are not recorded, the wait is taken from the result."""
+
+    def connection_check_out_failed(
+        self, event: monitoring.ConnectionCheckOutFailedEvent
+    ) -> None:
+        """Count a failed checkout, for example a wait queue timeout."""
+        with self._lock:
+            self._stats["checkouts_failed"] += 1
+            self._stats["checkout_wait_seconds_total"] += event.duration or 0.0
+
+    def connection_checked_out(
+        self, event: monitoring.ConnectionCheckedOutEvent
+    ) -> None:
+        """Record the time spent waiting for a connection."""
+        wait = event.duration or 0.0
+        with self._lock:
+            self._stats["checkouts"] += 1
+            self._stats["checked_out"] += 1
+            self._stats["checkout_wait_seconds_total"] += wait
+            self._stats["checkout_wait_seconds_max"] = max(
+                self._stats["checkout_wait_seconds_max"], wait
+            )
+
+    def connection_checked_in(self, event: monitoring.ConnectionCheckedInEvent) -> None:
+        """Record a connection returned to the pool."""
+        self._add("checked_out", -1)
+
+    def stats(self) -> dict[str, float]:
+        """Return the pool counters; ``checked_out`` is the current usage."""
+        with self._lock:
+            return dict(self._stats)
+
+    def reset(self) -> None:
+        """Reset every counter."""
+        with self._lock:
+            self._stats = {
+                "pools_created": 0,
+                "pools_cleared": 0,
+                "connections_created": 0,
+                "connections_closed": 0,
+                "checkouts": 0,
+                "checkouts_failed": 0,
+                "checked_out": 0,
+                "checkout_wait_seconds_total": 0.0,
+                "checkout_wait_seconds_max": 0.0,
+            }
+
+
+command_monitor = CommandMonitor(slow_command_ms=settings.MONGODB_SLOW_COMMAND_MS)
+pool_monitor = PoolMonitor()
+
+
+def get_mongodb_stats() -> dict[str, Any]:
+    """
+    Command and connection pool statistics of the MongoDB client
+    """
+    return {"commands": command_monitor.stats(), "pool": pool_monitor.stats()}
@@ -1,30 +1,91 @@
+import asyncio
 from contextlib import asynccontextmanager
 
 from core.config import settings
-from core.logger import get_logger, setup_logging
+from core.logger import (
+    get_logger,
+    request_log_policy,
+    setup_logging,
+    start_logging_queue,
+    stop_logging_queue,
+)
 
-setup_logging(log_level=settings.LOG_LEVEL, use_json=settings.LOG_JSON_FORMAT)
+setup_logging(
+    log_level=settings.LOG_LEVEL,
+    use_json=settings.LOG_JSON_FORMAT,
+    use_queue=settings.LOG_QUEUE_ENABLED,
+    queue_size=settings.LOG_QUEUE_MAX_SIZE,
+    drop_policy=settings.LOG_QUEUE_DROP_POLICY,
+)
+request_log_policy.configure(
+    sample_rate=settings.LOG_SAMPLE_RATE,
+    path_sample_rates=settings.LOG_PATH_SAMPLE_RATES,
+    slow_request_ms=settings.LOG_SLOW_REQUEST_MS,
+    single_line=settings.LOG_SINGLE_LINE,
+)
 logger = get_logger(name=__name__)
 
 # ruff: noqa: E402
 from core.constants import API_PREFIX
+from core.keyring import ASYMMETRIC_ALGORITHMS, keyring
+from core.metrics import registry
+from core.security import (
+    PasswordHashUnavailableError,
+    calibrate_password_hash,
+    configure_password_hash,
+    password_hash_pool,
+)
 from database.mongodb import mongodb
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from middlewares.admission import AdmissionControlMiddleware, admission_limits
 from middlewares.logging import LoggingMiddleware
+from repositories.indexes import ensure_indexes, verify_query_plans
 from routers import router
+from routers.well_known import well_known_router
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
-    Lifespan event to connect to MongoDB
+    Lifespan event to load the JWT signing keys, connect to MongoDB, create its
+    indexes and start the password hashing pool and the metrics flusher,
+    flushing queued log records on shutdown
     """
+    start_logging_queue()
+    if settings.JWT_ALGORITHM in ASYMMETRIC_ALGORITHMS:
+        keyring.load()
+    metrics_flusher = asyncio.create_task(
+        registry.flush_periodically(settings.METRICS_FLUSH_INTERVAL_SECONDS)
+    )
     await mongodb.connect()
+    if settings.MONGODB_ENSURE_INDEXES:
+        await ensure_indexes(mongodb.db)
+    if settings.MONGODB_VERIFY_QUERY_PLANS:
+        await verify_query_plans(mongodb.db)
+    if settings.ARGON2_CALIBRATE_ON_STARTUP:
+        params = await asyncio.to_thread(
+            calibrate_password_hash, target_ms=settings.ARGON2_TARGET_VERIFY_MS
+        )
+        logger.info(f"Calibrated argon2 parameters: {params}")
+        configure_password_hash(
+            time_cost=int(params["time_cost"]),
+            memory_cost=int(params["memory_cost"]),
+            parallelism=int(params["parallelism"]),
+        )
+    password_hash_pool.start()
     yield
+    metrics_flusher.cancel()
+    registry.write_snapshot(registry.snapshot())
+    password_hash_pool.shutdown()
     await mongodb.disconnect()
+    stop_logging_queue()
 
 
+# No default_response_class on purpose: routes with a return type are rendered
+# to JSON bytes by Pydantic directly, and a custom class (ORJSONResponse
+# included) would route them through jsonable_encoder instead.
 app = FastAPI(
     title="FastAPI MongoDB",
     description="Ready-to-use FastAPI template with MongoDB.",
@@ -52,6 +113,20 @@ app = FastAPI(
     },
 )
 
+app.include_router(router=well_known_router)
+
+# Inside CORS, so rejections still carry the CORS headers, and inside logging,
+# so they are logged and counted like any other response.
+if settings.ADMISSION_CONTROL_ENABLED:
+    app.add_middleware(
+        AdmissionControlMiddleware,
+        limits=admission_limits,
+        route_classes=settings.ADMISSION_ROUTE_CLASSES,
+        max_body_bytes=settings.MAX_REQUEST_BODY_BYTES,
+        retry_after_seconds=settings.ADMISSION_RETRY_AFTER_SECONDS,
+        path_max_body_bytes=settings.PATH_MAX_REQUEST_BODY_BYTES,
+    )
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -61,3 +136,18 @@ app.add_middleware(
 )
 
 app.add_middleware(middleware_class=LoggingMiddleware)
+
+
+@app.exception_handler(PasswordHashUnavailableError)
+async def password_hash_unavailable_handler(
+    request: Request, exc: PasswordHashUnavailableError
+) -> JSONResponse:
+    """
+    Fail fast with 503 when the password hashing pool is saturated
+    """
+    logger.warning(f"Password hashing unavailable: {exc}")
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Service temporarily unavailable"},
+        headers={"Retry-After": "1"},
+    )
@@ -0,0 +1,303 @@
+import asyncio
+import contextlib
+import math
+import time
+from collections import deque
+
+from core.config import settings
+from core.logger import get_logger
+from core.metrics import admission_requests_total
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = get_logger(name=__name__)
+
+# Rejections are counted in admission_requests_total; the warning only
+# summarises them, at most once per interval and route class.
+_REJECTION_WARNING_INTERVAL_SECONDS = 10.0
+
+
+class RequestBodyTooLargeError(Exception):
+    """Raised while reading a streamed request body past the size limit."""
+
+
+class AdmissionLimit:
+    """Bounded concurrency for one route class, with a bounded FIFO wait queue.
+
+    Up to ``max_in_flight`` requests run at once. Further requests wait in a
+    queue of at most ``max_queue`` entries for up to ``queue_timeout_seconds``;
+    a released slot is handed straight to the oldest waiter. Requests that
+    find the queue full or time out in it are rejected. Use it from the event
+    loop thread only.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_in_flight: int,
+        max_queue: int,
+        queue_timeout_seconds: float,
+    ):
+        self.name = name
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout_seconds = queue_timeout_seconds
+        self.in_flight = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self._unreported_rejections = 0
+        self._last_warning = -math.inf
+        self._counters = {
+            result: admission_requests_total.labels(name, result)
+            for result in ("admitted", "queued", "queue_full", "queue_timeout")
+        }
+
+    @property
+    def queued(self) -> int:
+        """Number of requests waiting for a slot."""
+        return len(self._waiters)
+
+    async def acquire(self) -> bool:
+        """Take a slot, waiting in the queue if needed.
+
+        Returns:
+            True if the request was admitted, False if it must be rejected.
+        """
+        if self.in_flight < self.max_in_flight and not self._waiters:
+            self.in_flight += 1
+            self._counters["admitted"].inc()
+            return True
+        if len(self._waiters) >= self.max_queue:
+            self._counters["queue_full"].inc()
+            return False
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        self._counters["queued"].inc()
+        try:
+            async with asyncio.timeout(self.queue_timeout_seconds):
+                await future
+        except BaseException as err:
+            if future.done() and not future.cancelled():
+                # The slot was handed over just as the wait ended: pass it on.
+                self.release()
+            else:
+                # release() may already have popped a cancelled waiter.
+                with contextlib.suppress(ValueError):
+                    self._waiters.remove(future)
+            if isinstance(err, TimeoutError):
+                self._counters["queue_timeout"].inc()
+                return False
+            raise
+        self._counters["admitted"].inc()
+        return True
+
+    def release(self) -> None:
+        """Free a slot, handing it to the oldest waiter if there is one."""
+        while self._waiters:
+            future = self._waiters.popleft()
+            if not future.done():
+                future.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def note_rejection(self) -> int:
+        """Count a rejected request towards the next rejection warning.
+
+        Returns:
+            The rejections since the last warning if a warning is due now,
+            otherwise zero.
+        """
+        self._unreported_rejections += 1
+        now = time.monotonic()
+        if now - self._last_warning < _REJECTION_WARNING_INTERVAL_SECONDS:
+            return 0
+        rejections, self._unreported_rejections = self._unreported_rejections, 0
+        self._last_warning = now
+        return rejections
+
+    def stats(self) -> dict[str, int]:
+        """Return the current usage and the limits."""
+        return {
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "max_in_flight": self.max_in_flight,
+            "max_queue": self.max_queue,
+        }
+
+
+class AdmissionControlMiddleware:
+    """Middleware to shed load before requests reach the application.
+
+    This middleware:
+    - Rejects requests whose Content-Length exceeds ``max_body_bytes`` with 413
+    - Stops streamed bodies once they exceed ``max_body_bytes``, with 413
+    - Limits the requests in flight per route class with ``AdmissionLimit``
+    - Rejects requests that cannot get a slot in time with 503 and Retry-After
+
+    Route classes are picked by the longest matching path prefix in
+    ``route_classes``, falling back to ``"default"``. Classes without a limit
+    are not limited. ``path_max_body_bytes`` overrides the body size limit by
+    path prefix the same way, zero meaning unlimited. Rejections never read
+    the request body.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        limits: dict[str, AdmissionLimit],
+        route_classes: dict[str, str],
+        max_body_bytes: int,
+        retry_after_seconds: int,
+        path_max_body_bytes: dict[str, int] | None = None,
+    ):
+        self.app = app
+        self.limits = limits
+        self.route_classes = sorted(
+            route_classes.items(), key=lambda item: -len(item[0])
+        )
+        self.max_body_bytes = max_body_bytes
+        self.path_max_body_bytes = sorted(
+            (path_max_body_bytes or {}).items(), key=lambda item: -len(item[0])
+        )
+        self.retry_after_seconds = retry_after_seconds
+
+    def route_class(self, path: str) -> str:
+        """Return the route class of ``path``."""
+        for prefix, route_class in self.route_classes:
+            if path.startswith(prefix):
+                return route_class
+        return "default"
+
+    def body_limit(self, path: str) -> int:
+        """Return the body size limit of ``path``, zero for unlimited."""
+        for prefix, max_body_bytes in self.path_max_body_bytes:
+            if path.startswith(prefix):
+                return max_body_bytes
+        return self.max_body_bytes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Admit, queue or reject the request.
+
+        Args:
+            scope: The ASGI connection scope.
+            receive: The ASGI receive channel.
+            send: The ASGI send channel.
+        """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        max_body_bytes = self.body_limit(scope["path"])
+        if max_body_bytes > 0:
+            content_length = Headers(scope=scope).get("content-length")
+            if content_length and content_length.isdigit():
+                if int(content_length) > max_body_bytes:
+                    await self._reject_body(scope, receive, send)
+                    return
+            else:
+                receive, send = self._limit_body(scope, receive, send, max_body_bytes)
+        limit = self.limits.get(self.route_class(scope["path"]))
+        if limit is None:
+            await self._call_app(scope, receive, send)
+            return
+        if not await limit.acquire():
+            rejections = limit.note_rejection()
+            if rejections:
+                logger.warning(
+                    f"Admission rejected {rejections} requests since the last "
+                    f"report: {limit.name} saturated, latest {scope['method']} "
+                    f"{scope['path']}"
+                )
+            await JSONResponse(
+                status_code=503,
+                content={"detail": "Service temporarily unavailable"},
+                headers={"Retry-After": str(self.retry_after_seconds)},
+            )(scope, receive, send)
+            return
+        try:
+            await self._call_app(scope, receive, send)
+        finally:
+            limit.release()
+
+    async def _call_app(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await self.app(scope, receive, send)
+        except RequestBodyTooLargeError:
+            # ``send`` is the limited one, which turns this into the 413.
+            await send({"type": "http.response.start", "status": 413})
+
+    async def _reject_body(self, scope: Scope, receive: Receive, send: Send) -> None:
+        admission_requests_total.labels(
+            self.route_class(scope["path"]), "body_too_large"
+        ).inc()
+        await _send_body_too_large(send)
+
+    def _limit_body(
+        self, scope: Scope, receive: Receive, send: Send, max_body_bytes: int
+    ) -> tuple[Receive, Send]:
+        received = 0
+        too_large = False
+        response_started = False
+
+        async def limited_receive() -> Message:
+            nonlocal received, too_large
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_body_bytes and not too_large:
+                    too_large = True
+                    admission_requests_total.labels(
+                        self.route_class(scope["path"]), "body_too_large"
+                    ).inc()
+                if too_large:
+                    raise RequestBodyTooLargeError
+            return message
+
+        async def limited_send(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                if response_started:
+                    return
+                response_started = True
+                if too_large:
+                    # Whatever the application answered once the body was cut
+                    # off (FastAPI turns it into a 400), the client gets a 413.
+                    await _send_body_too_large(send)
+                    return
+            elif too_large:
+                return
+            await send(message)
+
+        return limited_receive, limited_send
+
+
+async def _send_body_too_large(send: Send) -> None:
+    body = b'{"detail":"Request body too large"}'
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+admission_limits = {
+    name: AdmissionLimit(
+        name=name,
+        max_in_flight=max_in_flight,
+        max_queue=settings.ADMISSION_QUEUE_SIZE,
+        queue_timeout_seconds=settings.ADMISSION_QUEUE_TIMEOUT_MS / 1000,
+    )
+    for name, max_in_flight in settings.ADMISSION_LIMITS.items()
+}
+
+
+def get_admission_stats() -> dict[str, dict[str, int]]:
+    """
+    Current usage of every admission limit
+    """
+    return {name: limit.stats() for name, limit in admission_limits.items()}
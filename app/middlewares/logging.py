@@ -1,15 +1,19 @@
 import time
 import uuid
-from collections.abc import Callable
 
-from core.logger import get_logger
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from core.logger import (
+    current_request_id,
+    get_logger,
+    request_log_policy,
+    request_log_sampled,
+)
+from core.metrics import http_request_duration_seconds, http_requests_total
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 logger = get_logger(name=__name__)
 
 
-class LoggingMiddleware(BaseHTTPMiddleware):
+class LoggingMiddleware:
     """Middleware to log all HTTP requests and responses with timing information.
 
     This middleware:
@@ -18,44 +22,96 @@ class LoggingMiddleware(BaseHTTPMiddleware):
     - Measures request duration
     - Logs response status and duration
     - Adds request ID to response headers
+    - Samples requests according to ``request_log_policy``
+    - Records request counters and latency histograms per route template
+
+    The sampling decision is taken before any record is created: unsampled
+    requests skip the incoming record and only log their completion when
+    they fail or are slow, and sub-WARNING records logged while handling
+    them are dropped by ``RequestSampleFilter``. In single line mode the
+    incoming record is folded into the completion record.
+
+    It is a pure ASGI middleware: the response is never buffered or wrapped in
+    a new task, so streaming responses and background tasks behave as without
+    it, and the duration covers the whole response body.
     """
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """Process the request and log details.
 
         Args:
-            request: The incoming HTTP request.
-            call_next: The next middleware or route handler.
-
-        Returns:
-            The HTTP response.
+            scope: The ASGI connection scope.
+            receive: The ASGI receive channel.
+            send: The ASGI send channel.
         """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
         request_id = str(uuid.uuid4())
-        method = request.method
-        path = request.url.path
-        client_host = request.client.host if request.client else "unknown"
-        logger.info(
-            f"Incoming request: {method} {path}",
-            extra={
-                "request_id": request_id,
-                "method": method,
-                "path": path,
-                "client_host": client_host,
-                "query_params": str(request.query_params),
-            },
-        )
-        start_time = time.time()
-        response = await call_next(request)
-        process_time = (time.time() - start_time) * 1000
-        response.headers["X-Request-ID"] = request_id
-        logger.info(
-            f"Request completed: {method} {path} - {response.status_code}",
-            extra={
-                "request_id": request_id,
-                "method": method,
-                "path": path,
-                "status_code": response.status_code,
-                "duration_ms": round(process_time, 2),
-            },
-        )
-        return response
+        method = scope["method"]
+        path = scope["path"]
+        policy = request_log_policy
+        sampled = policy.sample(path)
+        sampled_token = request_log_sampled.set(sampled)
+        request_id_token = current_request_id.set(request_id)
+        if sampled and not policy.single_line:
+            logger.info(
+                f"Incoming request: {method} {path}",
+                extra={
+                    "request_id": request_id,
+                    "method": method,
+                    "path": path,
+                    "client_host": _client_host(scope),
+                    "query_params": scope.get("query_string", b"").decode("latin-1"),
+                },
+            )
+        status_code = 500
+        request_id_header = (b"x-request-id", request_id.encode())
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = [*message.get("headers", ()), request_id_header]
+            await send(message)
+
+        start_time = time.perf_counter_ns()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_log_sampled.reset(sampled_token)
+            current_request_id.reset(request_id_token)
+            process_time = (time.perf_counter_ns() - start_time) / 1_000_000
+            # Label by route template, not raw path, to bound the cardinality.
+            route = getattr(scope.get("route"), "path", "unmatched")
+            http_requests_total.labels(method, route, str(status_code)).inc()
+            http_request_duration_seconds.labels(method, route).observe(
+                process_time / 1000
+            )
+            if policy.log_completion(
+                sampled=sampled, status_code=status_code, duration_ms=process_time
+            ):
+                extra = {
+                    "request_id": request_id,
+                    "method": method,
+                    "path": path,
+                    "status_code": status_code,
+                    "duration_ms": round(process_time, 2),
+                }
+                if policy.single_line:
+                    extra["client_host"] = _client_host(scope)
+                    extra["query_params"] = scope.get("query_string", b"").decode(
+                        "latin-1"
+                    )
+                logger.info(
+                    f"Request completed: {method} {path} - {status_code}",
+                    extra=extra,
+                )
+
+
+def _client_host(scope: Scope) -> str:
+    client = scope.get("client")
+    return client[0] if client else "unknown"
@@ -0,0 +1,88 @@
+from collections.abc import Iterator, Mapping
+from typing import Any
+
+from core.logger import get_logger
+from pymongo import IndexModel
+from pymongo.errors import OperationFailure
+
+logger = get_logger(name=__name__)
+
+# Error codes for an existing index with the same name or keys but other options.
+_INDEX_CONFLICT_CODES = {85, 86}
+
+indexes: dict[str, list[IndexModel]] = {}
+query_shapes: dict[str, list[dict[str, Any]]] = {}
+
+
+class CollectionScanError(Exception):
+    """Raised when a registered query shape is planned as a collection scan."""
+
+
+def register_indexes(collection: str, *models: IndexModel) -> None:
+    """
+    Declare indexes a repository relies on
+    """
+    indexes.setdefault(collection, []).extend(models)
+
+
+def register_query_shape(collection: str, query_filter: dict[str, Any]) -> None:
+    """
+    Declare a filter a repository runs, with example values, for plan checks
+    """
+    query_shapes.setdefault(collection, []).append(query_filter)
+
+
+async def ensure_indexes(db: Any) -> None:
+    """
+    Create every registered index, leaving existing ones untouched
+    """
+    for collection, models in indexes.items():
+        for model in models:
+            try:
+                await db[collection].create_indexes([model])
+            except OperationFailure as err:
+                if err.code not in _INDEX_CONFLICT_CODES:
+                    raise
+                logger.warning(
+                    f"Index {model.document['name']} on {collection} conflicts "
+                    f"with an existing index: {err}"
+                )
+    logger.info(
+        f"Ensured {sum(len(models) for models in indexes.values())} MongoDB indexes"
+    )
+
+
+def _plan_stages(plan: Any) -> Iterator[str]:
+    if isinstance(plan, Mapping):
+        if isinstance(plan.get("stage"), str):
+            yield plan["stage"]
+        for value in plan.values():
+            yield from _plan_stages(value)
+    elif isinstance(plan, list):
+        for value in plan:
+            yield from _plan_stages(value)
+
+
+async def find_collection_scans(db: Any) -> list[str]:
+    """
+    Explain every registered query shape and return those planned as COLLSCAN
+    """
+    collection_scans = []
+    for collection, shapes in query_shapes.items():
+        for query_filter in shapes:
+            explain = await db[collection].find(query_filter).explain()
+            winning_plan = explain.get("queryPlanner", {}).get("winningPlan", {})
+            if "COLLSCAN" in _plan_stages(winning_plan):
+                collection_scans.append(f"{collection}: {query_filter}")
+    return collection_scans
+
+
+async def verify_query_plans(db: Any) -> None:
+    """
+    Fail if any registered query shape is planned as a collection scan
+    """
+    collection_scans = await find_collection_scans(db)
+    if collection_scans:
+        raise CollectionScanError(
+            "Queries planned as collection scans: " + "; ".join(collection_scans)
+        )
@@ -0,0 +1,73 @@
+import time
+from datetime import UTC, datetime
+
+from core.metrics import mongodb_operation_duration_seconds, timed
+from core.ratelimit import Rate, RateLimitStore
+from database.mongodb import mongodb
+from pymongo import ASCENDING, IndexModel, ReturnDocument
+
+from repositories.indexes import register_indexes, register_query_shape
+
+# Buckets are full again once their TAT has passed, so MongoDB can drop them.
+register_indexes(
+    "rate_limits",
+    IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0, name="expires_idx"),
+)
+# Every hit looks its bucket up by key, which is the _id.
+register_query_shape("rate_limits", {"_id": "key"})
+
+
+def get_collection():
+    """
+    Collection for rate limit buckets
+    """
+    return mongodb.db["rate_limits"]  # type: ignore
+
+
+class MongoRateLimitStore(RateLimitStore):
+    """Buckets shared by every worker through a MongoDB TTL collection.
+
+    Each hit is a single atomic pipeline update on the bucket document, so
+    concurrent workers never lose a hit. Timestamps are wall clock seconds,
+    which assumes the workers' clocks agree to well below one interval.
+    """
+
+    @timed(mongodb_operation_duration_seconds, "rate_limits", "hit")
+    async def hit(self, key: str, rate: Rate) -> float:
+        """Take one token from the bucket of ``key``.
+
+        Args:
+            key: The bucket key.
+            rate: The rate of the bucket.
+
+        Returns:
+            Zero if allowed, otherwise the seconds until a token is available.
+        """
+        now = time.time()
+        tat = {"$max": [{"$ifNull": ["$tat", now]}, now]}
+        # Every TAT, allowed or not, is at most now + tolerance + interval.
+        expires_at = datetime.fromtimestamp(now + rate.tolerance + rate.interval, UTC)
+        bucket = await get_collection().find_one_and_update(
+            {"_id": key},
+            [
+                {"$set": {"allowed": {"$lte": [tat, now + rate.tolerance]}}},
+                {
+                    "$set": {
+                        "tat": {
+                            "$cond": [
+                                "$allowed",
+                                {"$add": [tat, rate.interval]},
+                                "$tat",
+                            ]
+                        },
+                        "expires_at": expires_at,
+                    }
+                },
+            ],
+            projection={"_id": 0, "allowed": 1, "tat": 1},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        if bucket["allowed"]:  # type: ignore
+            return 0.0
+        return bucket["tat"] - now - rate.tolerance  # type: ignore
@@ -1,5 +1,68 @@
+from collections.abc import Mapping
+from typing import Any
+
+from core.metrics import mongodb_operation_duration_seconds, timed
 from database.mongodb import mongodb
-from schemas.user import UserInDB
+from pymongo import ASCENDING, IndexModel
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from schemas.user import User, UserInDB
+
+from repositories.indexes import register_indexes, register_query_shape
+
+register_indexes(
+    "users",
+    IndexModel([("username", ASCENDING)], unique=True, name="username_unique_idx"),
+    IndexModel(
+        [("email", ASCENDING)], unique=True, sparse=True, name="email_unique_idx"
+    ),
+)
+# Every user query looks users up by username, one or a batch at a time.
+register_query_shape("users", {"username": "username"})
+register_query_shape("users", {"username": {"$in": ["username", "other"]}})
+
+# Only the authentication path needs the password hash.
+PUBLIC_USER_PROJECTION = {"_id": 0, "username": 1, "email": 1}
+CREDENTIALS_PROJECTION = {
+    "_id": 0,
+    "username": 1,
+    "email": 1,
+    "hashed_password": 1,
+    "token_version": 1,
+}
+
+
+class DuplicateUserError(Exception):
+    """Raised when a user with the same username or email already exists."""
+
+    def __init__(self, field: str):
+        super().__init__(f"A user with this {field} already exists")
+        self.field = field
+
+
+class UserWriteError(Exception):
+    """Raised when the database rejects a user document for another reason."""
+
+
+# Server error code for a unique index violation.
+_DUPLICATE_KEY_CODE = 11000
+
+
+def _duplicate_field(err: DuplicateKeyError) -> str:
+    return _write_error_field(err.details or {}, str(err))
+
+
+def _write_error_field(details: Mapping[str, Any], message: str) -> str:
+    key_pattern = details.get("keyPattern")
+    if key_pattern:
+        return next(iter(key_pattern))
+    return "email" if "email_unique_idx" in message else "username"
+
+
+def _write_error(error: Mapping[str, Any]) -> DuplicateUserError | UserWriteError:
+    message = error.get("errmsg", "")
+    if error.get("code") == _DUPLICATE_KEY_CODE:
+        return DuplicateUserError(field=_write_error_field(error, message))
+    return UserWriteError(message or f"Write error {error.get('code')}")
 
 
 def get_collection():
@@ -9,27 +72,110 @@ def get_collection():
     return mongodb.db["users"]  # type: ignore
 
 
-async def find_user_by_username(username: str) -> UserInDB | None:
+@timed(mongodb_operation_duration_seconds, "users", "find_public_user")
+async def find_public_user(username: str) -> User | None:
+    """
+    Find the public fields of a user by username in the database
+    """
+    user = await get_collection().find_one(
+        {"username": username}, projection=PUBLIC_USER_PROJECTION
+    )
+    return User.from_document(user) if user else None
+
+
+@timed(mongodb_operation_duration_seconds, "users", "find_public_users")
+async def find_public_users(usernames: list[str]) -> dict[str, User]:
     """
-    Find user by username in the database
+    Find the public fields of several users by username in the database
     """
-    user = await get_collection().find_one({"username": username})
-    return UserInDB(**user) if user else None
+    cursor = get_collection().find(
+        {"username": {"$in": usernames}}, projection=PUBLIC_USER_PROJECTION
+    )
+    return {user["username"]: User.from_document(user) async for user in cursor}
+
 
+@timed(mongodb_operation_duration_seconds, "users", "find_credentials")
+async def find_credentials(username: str) -> UserInDB | None:
+    """
+    Find a user with its password hash and token version by username in the database
+    """
+    user = await get_collection().find_one(
+        {"username": username}, projection=CREDENTIALS_PROJECTION
+    )
+    return UserInDB.from_document(user) if user else None
 
+
+@timed(mongodb_operation_duration_seconds, "users", "insert_user")
 async def insert_user(user: UserInDB) -> UserInDB | None:
     """
-    Insert user in the database
+    Insert user in the database, relying on the unique indexes to reject
+    duplicates
+    """
+    # Missing emails are left out of the document so the sparse unique index
+    # ignores them instead of treating every null as a duplicate.
+    try:
+        result = await get_collection().insert_one(user.model_dump(exclude_none=True))
+    except DuplicateKeyError as err:
+        raise DuplicateUserError(field=_duplicate_field(err)) from err
+    return user if result.acknowledged else None
+
+
+@timed(mongodb_operation_duration_seconds, "users", "insert_users")
+async def insert_users(
+    users: list[UserInDB],
+) -> tuple[int, dict[int, DuplicateUserError | UserWriteError]]:
+    """
+    Insert users in a single unordered bulk write, returning how many were
+    inserted and the rejected ones keyed by their position in ``users``
     """
-    await get_collection().insert_one(user.model_dump())
-    return user if user else None
+    try:
+        result = await get_collection().insert_many(
+            [user.model_dump(exclude_none=True) for user in users], ordered=False
+        )
+    except BulkWriteError as err:
+        return err.details.get("nInserted", 0), {
+            error["index"]: _write_error(error)
+            for error in err.details.get("writeErrors", [])
+        }
+    return len(result.inserted_ids), {}
+
+
+@timed(mongodb_operation_duration_seconds, "users", "find_token_version")
+async def find_token_version(username: str) -> int | None:
+    """
+    Find the token version of a user in the database
+    """
+    user = await get_collection().find_one(
+        {"username": username}, projection={"_id": 0, "token_version": 1}
+    )
+    return user.get("token_version", 0) if user is not None else None
+
+
+@timed(mongodb_operation_duration_seconds, "users", "update_password_hash")
+async def update_password_hash(
+    username: str, old_hashed_password: str, hashed_password: str
+) -> bool:
+    """
+    Replace the password hash of a user if it still has the given hash, keeping
+    its token version
+    """
+    result = await get_collection().update_one(
+        {"username": username, "hashed_password": old_hashed_password},
+        {"$set": {"hashed_password": hashed_password}},
+    )
+    return result.matched_count == 1
 
 
-async def update_user(user: UserInDB) -> UserInDB | None:
+@timed(mongodb_operation_duration_seconds, "users", "update_user_password")
+async def update_user_password(
+    username: str, old_hashed_password: str, hashed_password: str
+) -> bool:
     """
-    Update user in the database
+    Replace the password of a user if it still has the given hash, bumping its
+    token version in the database
     """
-    await get_collection().update_one(
-        {"username": user.username}, {"$set": user.model_dump()}
+    result = await get_collection().update_one(
+        {"username": username, "hashed_password": old_hashed_password},
+        {"$set": {"hashed_password": hashed_password}, "$inc": {"token_version": 1}},
     )
-    return user if user else None
+    return result.matched_count == 1
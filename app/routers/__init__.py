@@ -1,8 +1,14 @@
+from core.config import settings
 from fastapi import APIRouter
 
+from routers.admin import admin_router
 from routers.auth import auth_router
 from routers.me import me_router
+from routers.metrics import metrics_router
 
 router = APIRouter(prefix="/api/v1")
 router.include_router(router=auth_router)
 router.include_router(router=me_router)
+router.include_router(router=admin_router)
+if settings.METRICS_ENABLED:
+    router.include_router(router=metrics_router)
@@ -0,0 +1,76 @@
+from typing import Annotated
+
+from core.logger import get_logger
+from fastapi import APIRouter, Depends, Query, Request, status
+from schemas.user import User, UserImportReport
+from services.auth import get_current_admin
+from services.user_import import ImportFormat, import_users
+
+logger = get_logger(name=__name__)
+
+admin_router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+@admin_router.post(
+    path="/users/import",
+    summary="Import users",
+    description=(
+        "Import users from an NDJSON or CSV (header row, one user per line) "
+        "request body, streamed in batches"
+    ),
+    status_code=status.HTTP_200_OK,
+    response_description="Import report",
+    responses={
+        status.HTTP_200_OK: {
+            "description": "Import report",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "inserted": 2,
+                        "failed": 1,
+                        "errors": [
+                            {
+                                "line": 3,
+                                "username": "string",
+                                "error": "Username already exists",
+                            }
+                        ],
+                        "errors_truncated": False,
+                    }
+                }
+            },
+        },
+        status.HTTP_401_UNAUTHORIZED: {
+            "description": "Invalid credentials",
+            "content": {
+                "application/json": {"example": {"detail": "Invalid credentials"}}
+            },
+        },
+        status.HTTP_403_FORBIDDEN: {
+            "description": "Not an administrator",
+            "content": {
+                "application/json": {"example": {"detail": "Not enough permissions"}}
+            },
+        },
+    },
+    operation_id="import_users",
+)
+async def post_import_users(
+    request: Request,
+    admin: Annotated[User, Depends(get_current_admin)],
+    import_format: Annotated[ImportFormat | None, Query(alias="format")] = None,
+) -> UserImportReport:
+    """
+    Import users from the request body, reading the format from the query or
+    the content type
+    """
+    if import_format is None:
+        content_type = request.headers.get("content-type", "")
+        import_format = "csv" if "csv" in content_type else "ndjson"
+    logger.info(f"User {admin.username} importing users from {import_format}")
+    report = await import_users(chunks=request.stream(), import_format=import_format)
+    logger.info(
+        f"User import by {admin.username} finished: {report.inserted} inserted, "
+        f"{report.failed} failed"
+    )
+    return report
@@ -4,9 +4,10 @@ from core.jwt import create_access_token, create_refresh_token, verify_refresh_t
 from core.logger import get_logger
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
+from repositories.user import DuplicateUserError
 from schemas.user import RefreshToken, Token, User, UserCreate
-from services.auth import authenticate_user
-from services.user import create_user, get_user
+from services.auth import authenticate_user, build_token_claims, throttle_login
+from services.user import create_user, get_user_in_db
 
 logger = get_logger(name=__name__)
 
@@ -32,9 +33,9 @@ auth_router = APIRouter(prefix="/auth", tags=["auth"])
             },
         },
         status.HTTP_400_BAD_REQUEST: {
-            "description": "Invalid input data",
+            "description": "Username or email already exists",
             "content": {
-                "application/json": {"example": {"detail": "Invalid input data"}}
+                "application/json": {"example": {"detail": "Username already exists"}}
             },
         },
         status.HTTP_500_INTERNAL_SERVER_ERROR: {
@@ -53,14 +54,16 @@ async def register(user: UserCreate) -> User:
     Register a new user in the database
     """
     logger.info(f"Attempting to register user: {user.username}")
-    existing_user = await get_user(username=user.username)
-    if existing_user:
-        logger.error(f"Registration failed: User {user.username} already exists")
+    try:
+        user_created = await create_user(user=user)
+    except DuplicateUserError as err:
+        logger.error(
+            f"Registration failed: {err.field} of user {user.username} already exists"
+        )
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="User already exists",
-        )
-    user_created = await create_user(user=user)
+            detail=f"{err.field.capitalize()} already exists",
+        ) from err
     if not user_created:
         logger.error(f"Failed to create user {user.username} in database")
         raise HTTPException(
@@ -92,7 +95,16 @@ async def register(user: UserCreate) -> User:
                 "application/json": {"example": {"detail": "Invalid credentials"}}
             },
         },
+        status.HTTP_429_TOO_MANY_REQUESTS: {
+            "description": "Too many login attempts",
+            "content": {
+                "application/json": {
+                    "example": {"detail": "Too many attempts, try again later"}
+                }
+            },
+        },
     },
+    dependencies=[Depends(throttle_login)],
     operation_id="login",
 )
 async def login(
@@ -115,8 +127,9 @@ async def login(
             f"Login failed for user: {form_data.username} - Invalid credentials"
         )
         raise credentials_exception
-    access_token = create_access_token(data={"sub": user.username})
-    refresh_token = create_refresh_token(data={"sub": user.username})
+    claims = build_token_claims(user=user)
+    access_token = create_access_token(data=claims)
+    refresh_token = create_refresh_token(data=claims)
     logger.info(f"User {user.username} logged in successfully")
     return Token(
         access_token=access_token,
@@ -180,15 +193,19 @@ async def refresh(
     if not username:
         logger.error("Token refresh failed: Username not found in token")
         raise credentials_exception
-    user = await get_user(username=username)
+    user = await get_user_in_db(username=username)
     if not user:
         logger.error(f"Token refresh failed: User {username} not found")
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found",
         )
-    access_token = create_access_token(data={"sub": user.username})
-    refresh_token = create_refresh_token(data={"sub": user.username})
+    if payload.get("token_version", 0) != user.token_version:
+        logger.warning(f"Token refresh failed: Token revoked for user {username}")
+        raise credentials_exception
+    claims = build_token_claims(user=user)
+    access_token = create_access_token(data=claims)
+    refresh_token = create_refresh_token(data=claims)
     logger.info(f"Access token refreshed successfully for user: {user.username}")
     return Token(
         access_token=access_token,
@@ -2,8 +2,13 @@ from typing import Annotated
 
 from core.logger import get_logger
 from fastapi import APIRouter, Depends, HTTPException, status
-from schemas.user import ChangePassword, User
-from services.auth import authenticate_user, get_current_user
+from schemas.user import ChangePassword, User, UserInDB
+from services.auth import (
+    get_current_user,
+    get_current_user_credentials,
+    throttle_change_password,
+    verify_user_password,
+)
 from services.user import change_password
 
 logger = get_logger(name=__name__)
@@ -72,19 +77,28 @@ async def me(
                 "application/json": {"example": {"detail": "Invalid credentials"}}
             },
         },
-        status.HTTP_500_INTERNAL_SERVER_ERROR: {
-            "description": "Internal server error",
+        status.HTTP_409_CONFLICT: {
+            "description": "Password changed concurrently",
             "content": {
                 "application/json": {
-                    "example": {"detail": "An unexpected error occurred"}
+                    "example": {"detail": "Password was changed concurrently"}
+                }
+            },
+        },
+        status.HTTP_429_TOO_MANY_REQUESTS: {
+            "description": "Too many password change attempts",
+            "content": {
+                "application/json": {
+                    "example": {"detail": "Too many attempts, try again later"}
                 }
             },
         },
     },
+    dependencies=[Depends(throttle_change_password)],
     operation_id="change_password",
 )
 async def patch_change_password(
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[UserInDB, Depends(get_current_user_credentials)],
     passwords: ChangePassword,
 ) -> User:
     """
@@ -96,22 +110,22 @@ async def patch_change_password(
         detail="Incorrect username or password",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    user = await authenticate_user(
-        username=current_user.username, password=passwords.old_password
-    )
-    if not user:
+    if not await verify_user_password(
+        user=current_user, password=passwords.old_password
+    ):
         logger.warning(
             f"Password change failed for user {current_user.username}: Incorrect old password"
         )
         raise credentials_exception
     user = await change_password(user=current_user, new_password=passwords.new_password)
     if not user:
-        logger.error(
-            f"Failed to change password for user {current_user.username} in database"
+        logger.warning(
+            f"Password change failed for user {current_user.username}: "
+            "Password changed concurrently"
         )
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="An unexpected error occurred",
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Password was changed concurrently",
         )
     logger.info(f"Password changed successfully for user {current_user.username}")
     return user
@@ -0,0 +1,41 @@
+import asyncio
+
+from core.metrics import CONTENT_TYPE, registry
+from fastapi import APIRouter, Depends, Response, status
+from services.auth import require_metrics_token
+
+metrics_router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+
+@metrics_router.get(
+    path="",
+    summary="Prometheus metrics",
+    description="Request, password hashing, JWT and MongoDB metrics in the Prometheus text format",
+    status_code=status.HTTP_200_OK,
+    response_description="Metrics in the Prometheus text format",
+    response_class=Response,
+    responses={
+        status.HTTP_200_OK: {
+            "description": "Metrics in the Prometheus text format",
+            "content": {CONTENT_TYPE: {"example": "http_requests_total 1"}},
+        },
+        status.HTTP_401_UNAUTHORIZED: {
+            "description": "Missing or invalid metrics token",
+            "content": {
+                "application/json": {
+                    "example": {"detail": "Could not validate credentials"}
+                }
+            },
+        },
+    },
+    dependencies=[Depends(require_metrics_token)],
+    operation_id="metrics",
+)
+async def metrics() -> Response:
+    """
+    Serve the metrics of this worker, merged with the other workers' in multiprocess mode
+    """
+    # Snapshot on the event loop, where metrics are updated, and do the file
+    # I/O and rendering in a thread.
+    body = await asyncio.to_thread(registry.collect, registry.snapshot())
+    return Response(content=body, media_type=CONTENT_TYPE)
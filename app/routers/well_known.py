@@ -0,0 +1,51 @@
+from core.config import settings
+from core.keyring import keyring
+from fastapi import APIRouter, Request, Response, status
+
+well_known_router = APIRouter(prefix="/.well-known", tags=["well-known"])
+
+
+@well_known_router.get(
+    path="/jwks.json",
+    summary="JSON Web Key Set",
+    description="Public keys that verify the access and refresh tokens",
+    status_code=status.HTTP_200_OK,
+    response_description="JSON Web Key Set",
+    response_class=Response,
+    responses={
+        status.HTTP_200_OK: {
+            "description": "JSON Web Key Set",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "keys": [
+                            {
+                                "kty": "OKP",
+                                "crv": "Ed25519",
+                                "x": "string",
+                                "kid": "string",
+                                "alg": "EdDSA",
+                                "use": "sig",
+                            }
+                        ]
+                    }
+                }
+            },
+        },
+        status.HTTP_304_NOT_MODIFIED: {"description": "JWKS not modified"},
+    },
+    operation_id="jwks",
+)
+async def jwks(request: Request) -> Response:
+    """
+    Serve the public signing keys, honouring If-None-Match
+    """
+    body, etag = keyring.jwks()
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={settings.JWKS_MAX_AGE_SECONDS}",
+    }
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
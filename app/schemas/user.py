@@ -1,3 +1,6 @@
+from collections.abc import Mapping
+from typing import Any, Self
+
 from pydantic import BaseModel, EmailStr
 
 
@@ -20,6 +23,14 @@ class User(BaseModel):
     username: str
     email: EmailStr | None = None
 
+    @classmethod
+    def from_document(cls, document: Mapping[str, Any]) -> Self:
+        """
+        Build the model from a trusted MongoDB document without validating it,
+        ignoring fields the model does not declare
+        """
+        return cls.model_construct(**document)
+
 
 class UserCreate(User):
     password: str
@@ -27,3 +38,23 @@ class UserCreate(User):
 
 class UserInDB(User):
     hashed_password: str
+    token_version: int = 0
+
+    def to_user(self) -> User:
+        """
+        Drop the credentials without validating the public fields again
+        """
+        return User.model_construct(username=self.username, email=self.email)
+
+
+class UserImportError(BaseModel):
+    line: int
+    username: str | None = None
+    error: str
+
+
+class UserImportReport(BaseModel):
+    inserted: int = 0
+    failed: int = 0
+    errors: list[UserImportError] = []
+    errors_truncated: bool = False
@@ -0,0 +1,109 @@
+import argparse
+import os
+from pathlib import Path
+
+import uvicorn
+from core.config import settings
+from core.cpu import worker_count
+from core.keyring import ASYMMETRIC_ALGORITHMS
+from core.logger import get_logger, setup_logging
+from core.security import calibrate_password_hash, configure_password_hash
+
+APP_DIR = Path(__file__).resolve().parent
+
+logger = get_logger(name=__name__)
+
+
+def clear_metrics_dir() -> None:
+    """Remove the snapshots of previous workers from the metrics directory."""
+    if not settings.METRICS_MULTIPROCESS_DIR:
+        return
+    for path in Path(settings.METRICS_MULTIPROCESS_DIR).glob("*.json"):
+        path.unlink(missing_ok=True)
+
+
+def calibrate_once() -> None:
+    """Calibrate argon2 here so that every worker uses the same parameters.
+
+    Workers calibrating on their own would each pick different costs, and
+    every login would then rehash the password for the worker serving it. The
+    parameters reach the workers through the environment, which takes
+    precedence over the ``.env`` file, with calibration on startup turned off.
+    """
+    if not settings.ARGON2_CALIBRATE_ON_STARTUP:
+        return
+    params = calibrate_password_hash(target_ms=settings.ARGON2_TARGET_VERIFY_MS)
+    logger.info(f"Calibrated argon2 parameters: {params}")
+    costs = {
+        name: int(params[name]) for name in ("time_cost", "memory_cost", "parallelism")
+    }
+    os.environ.update(
+        {f"ARGON2_{name.upper()}": str(value) for name, value in costs.items()}
+    )
+    os.environ["ARGON2_CALIBRATE_ON_STARTUP"] = "false"
+    # A single worker runs in this process, with the settings already loaded.
+    for name, value in costs.items():
+        setattr(settings, f"ARGON2_{name.upper()}", value)
+    settings.ARGON2_CALIBRATE_ON_STARTUP = False
+    configure_password_hash(**costs)
+
+
+def main() -> None:
+    """Run the application with uvicorn in production mode.
+
+    Each worker is a separate process that imports ``main:app`` and runs its
+    lifespan. On SIGTERM or SIGINT uvicorn stops accepting connections, waits
+    up to ``SERVER_GRACEFUL_SHUTDOWN_SECONDS`` for in-flight requests, then
+    runs the lifespan shutdown, which flushes metrics and logs and closes the
+    MongoDB client.
+    """
+    parser = argparse.ArgumentParser(description="FastAPI MongoDB server")
+    parser.add_argument("--host", default=settings.BACKEND_HOST)
+    parser.add_argument("--port", type=int, default=settings.BACKEND_PORT)
+    parser.add_argument("--workers", type=int, default=settings.SERVER_WORKERS)
+    args = parser.parse_args()
+
+    setup_logging(log_level=settings.LOG_LEVEL, use_json=settings.LOG_JSON_FORMAT)
+    workers = worker_count(args.workers)
+    if (
+        workers > 1
+        and settings.JWT_ALGORITHM in ASYMMETRIC_ALGORITHMS
+        and not settings.JWT_KEYS_DIR
+    ):
+        # Every worker would generate its own ephemeral key, and tokens signed
+        # by one worker would fail on the others.
+        parser.error(
+            f"JWT_ALGORITHM {settings.JWT_ALGORITHM} with {workers} workers "
+            "needs JWT_KEYS_DIR"
+        )
+    clear_metrics_dir()
+    calibrate_once()
+    if workers > 1 and not settings.METRICS_MULTIPROCESS_DIR:
+        logger.warning(
+            "METRICS_MULTIPROCESS_DIR is unset: each scrape only sees one worker"
+        )
+    logger.info(
+        f"Starting {workers} workers on {args.host}:{args.port} "
+        f"({settings.SERVER_LOOP} loop, {settings.SERVER_HTTP} HTTP)"
+    )
+    uvicorn.run(
+        "main:app",
+        app_dir=str(APP_DIR),
+        host=args.host,
+        port=args.port,
+        workers=workers,
+        loop=settings.SERVER_LOOP,
+        http=settings.SERVER_HTTP,
+        backlog=settings.SERVER_BACKLOG,
+        timeout_keep_alive=settings.SERVER_KEEP_ALIVE_SECONDS,
+        timeout_graceful_shutdown=settings.SERVER_GRACEFUL_SHUTDOWN_SECONDS,
+        forwarded_allow_ips=settings.SERVER_FORWARDED_ALLOW_IPS or None,
+        # The application configures logging itself, and LoggingMiddleware
+        # already writes one record per request.
+        log_config=None,
+        access_log=False,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,25 @@
-from typing import Annotated
+import hmac
+import math
+from typing import Annotated, Any
 
+from core.config import settings
 from core.constants import API_PREFIX
 from core.jwt import decode_access_token
-from core.security import verify_password
-from fastapi import Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer
+from core.metrics import rate_limited_total
+from core.ratelimit import MemoryRateLimitStore, Rate, RateLimitStore
+from core.security import verify_and_update_password_async, verify_password_async
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from jwt.exceptions import InvalidTokenError
+from repositories.rate_limit import MongoRateLimitStore
 from schemas.user import User, UserInDB
 
-from services.user import get_user, get_user_in_db
+from services.user import (
+    get_token_version,
+    get_user,
+    get_user_in_db,
+    rehash_password,
+)
 
 oauth2_scheme = OAuth2PasswordBearer(
     tokenUrl=f"{API_PREFIX}/auth/login",
@@ -17,40 +28,202 @@ oauth2_scheme = OAuth2PasswordBearer(
     refreshUrl=f"{API_PREFIX}/auth/refresh",
 )
 
+# Attempts that lead to an argon2 verify are limited per client IP, per username
+# from each IP and per username before any hashing, so a burst of guesses is
+# rejected cheaply.
+rate_limit_store: RateLimitStore = (
+    MongoRateLimitStore()
+    if settings.RATE_LIMIT_BACKEND == "mongodb"
+    else MemoryRateLimitStore(max_keys=settings.RATE_LIMIT_MAX_KEYS)
+)
+username_rate = Rate(
+    per_minute=settings.RATE_LIMIT_USERNAME_PER_MINUTE,
+    burst=settings.RATE_LIMIT_USERNAME_BURST,
+)
+username_ip_rate = Rate(
+    per_minute=settings.RATE_LIMIT_USERNAME_IP_PER_MINUTE,
+    burst=settings.RATE_LIMIT_USERNAME_IP_BURST,
+)
+ip_rate = Rate(
+    per_minute=settings.RATE_LIMIT_IP_PER_MINUTE, burst=settings.RATE_LIMIT_IP_BURST
+)
+
 
 async def authenticate_user(username: str, password: str) -> UserInDB | None:
     """
-    Authenticate a user with the given username and password
+    Authenticate a user with the given username and password, upgrading the
+    stored hash when it was created with stale argon2 parameters
     """
     user = await get_user_in_db(username=username)
     if not user:
         return None
-    if not verify_password(
+    is_valid, updated_hash = await verify_and_update_password_async(
         plain_password=password, hashed_password=user.hashed_password
-    ):
+    )
+    if not is_valid:
         return None
+    if updated_hash:
+        user = await rehash_password(user=user, hashed_password=updated_hash) or user
     return user
 
 
-async def get_current_user(
-    token: Annotated[str, Depends(oauth2_scheme)],
-) -> User | None:
+def build_token_claims(user: UserInDB) -> dict[str, Any]:
     """
-    Get the current user from the token
+    Build the JWT claims for a user, embedding the public user fields when
+    stateless claims authentication is enabled
     """
-    credentials_exception = HTTPException(
+    claims: dict[str, Any] = {
+        "sub": user.username,
+        "token_version": user.token_version,
+    }
+    if settings.AUTH_STATELESS_CLAIMS:
+        claims["email"] = user.email
+    return claims
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+def _decode_access_token(token: str) -> tuple[str, dict[str, Any]]:
     try:
         payload = decode_access_token(token=token)
-        username = payload.get("sub")
-        if not username:
-            raise credentials_exception
     except InvalidTokenError as err:
-        raise credentials_exception from err
+        raise _credentials_exception() from err
+    username = payload.get("sub")
+    if not username:
+        raise _credentials_exception()
+    return username, payload
+
+
+async def get_current_user(
+    token: Annotated[str, Depends(oauth2_scheme)],
+) -> User | None:
+    """
+    Get the current user from the token
+    """
+    username, payload = _decode_access_token(token=token)
+    if "token_version" in payload:
+        token_version = await get_token_version(username=username)
+        if token_version is None or payload["token_version"] != token_version:
+            raise _credentials_exception()
+        if settings.AUTH_STATELESS_CLAIMS:
+            # A token minted without the user claims cannot build the principal.
+            if "email" not in payload:
+                raise _credentials_exception()
+            # The claims were signed by us, so they need no validation.
+            return User.model_construct(username=username, email=payload["email"])
     user = await get_user(username=username)
     if not user:
-        raise credentials_exception
+        raise _credentials_exception()
+    return user
+
+
+async def get_current_admin(
+    user: Annotated[User, Depends(get_current_user)],
+) -> User:
+    """
+    Get the current user, requiring it to be listed in ADMIN_USERNAMES
+    """
+    if user.username not in settings.ADMIN_USERNAMES:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions"
+        )
     return user
+
+
+async def get_current_user_credentials(
+    token: Annotated[str, Depends(oauth2_scheme)],
+) -> UserInDB:
+    """
+    Get the current user with its credentials from the token, for endpoints
+    that check the password, loading the user once per request
+    """
+    username, payload = _decode_access_token(token=token)
+    user = await get_user_in_db(username=username)
+    if not user:
+        raise _credentials_exception()
+    if payload.get("token_version", user.token_version) != user.token_version:
+        raise _credentials_exception()
+    return user
+
+
+async def verify_user_password(user: UserInDB, password: str) -> bool:
+    """
+    Verify a password against the credentials already loaded for a user
+    """
+    return await verify_password_async(
+        plain_password=password, hashed_password=user.hashed_password
+    )
+
+
+async def check_rate_limits(action: str, username: str, client_host: str) -> None:
+    """
+    Take one attempt from the client IP and username buckets of an action,
+    raising 429 with Retry-After when any is empty
+    """
+    if not settings.RATE_LIMIT_ENABLED:
+        return
+    # The tight per username and IP bucket comes before the looser account-wide
+    # one, so guesses from a single address cannot drain the owner's bucket.
+    buckets = (
+        ("ip", client_host, ip_rate),
+        ("username_ip", f"{username}:{client_host}", username_ip_rate),
+        ("username", username, username_rate),
+    )
+    for scope, value, rate in buckets:
+        retry_after = await rate_limit_store.hit(f"{action}:{scope}:{value}", rate)
+        if retry_after > 0:
+            rate_limited_total.labels(action, scope).inc()
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many attempts, try again later",
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
+
+
+def _client_host(request: Request) -> str:
+    return request.client.host if request.client else "unknown"
+
+
+async def require_metrics_token(request: Request) -> None:
+    """
+    Require the METRICS_TOKEN bearer token to scrape metrics, when it is set
+    """
+    if not settings.METRICS_TOKEN:
+        return
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(
+        token.encode(), settings.METRICS_TOKEN.encode()
+    ):
+        raise _credentials_exception()
+
+
+async def throttle_login(
+    request: Request,
+    form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
+) -> None:
+    """
+    Rate limit login attempts
+    """
+    await check_rate_limits(
+        action="login", username=form_data.username, client_host=_client_host(request)
+    )
+
+
+async def throttle_change_password(
+    request: Request,
+    user: Annotated[UserInDB, Depends(get_current_user_credentials)],
+) -> None:
+    """
+    Rate limit password changes, which verify the old password
+    """
+    await check_rate_limits(
+        action="change_password",
+        username=user.username,
+        client_host=_client_host(request),
+    )
@@ -1,50 +1,149 @@
-from core.security import get_password_hash
-from repositories.user import find_user_by_username, insert_user, update_user
+from core.cache import TTLCache
+from core.coalescing import BatchLoader, SingleFlight
+from core.config import settings
+from core.security import hash_password_async
+from repositories.user import (
+    find_credentials,
+    find_public_user,
+    find_public_users,
+    find_token_version,
+    insert_user,
+    update_password_hash,
+    update_user_password,
+)
 from schemas.user import User, UserCreate, UserInDB
 
+# Principal cache for the authentication path, keyed by username. Entries are
+# invalidated explicitly on writes and expire after USER_CACHE_TTL_SECONDS.
+user_cache = TTLCache(
+    max_size=settings.USER_CACHE_MAX_SIZE,
+    ttl_seconds=settings.USER_CACHE_TTL_SECONDS,
+)
+
+# Current token version per username, used to revoke issued access tokens. Other
+# workers observe a bumped version after at most TOKEN_VERSION_CACHE_TTL_SECONDS.
+token_version_cache = TTLCache(
+    max_size=settings.TOKEN_VERSION_CACHE_MAX_SIZE,
+    ttl_seconds=settings.TOKEN_VERSION_CACHE_TTL_SECONDS,
+)
+
+# Cache misses for the same username that overlap share one database lookup.
+# With USER_LOOKUP_BATCH_WINDOW_MS set, the misses arriving within the window
+# are loaded together with a single $in query instead.
+user_lookups = SingleFlight(name="find_public_user")
+token_version_lookups = SingleFlight(name="find_token_version")
+user_batch_loader = BatchLoader(
+    name="find_public_users",
+    load_many=lambda usernames: find_public_users(usernames=usernames),
+    window_seconds=settings.USER_LOOKUP_BATCH_WINDOW_MS / 1000,
+    max_batch_size=settings.USER_LOOKUP_MAX_BATCH_SIZE,
+)
+
+
+def get_lookup_stats() -> dict[str, dict[str, int]]:
+    """
+    Counters of the coalesced and batched user lookups
+    """
+    return {
+        lookups.name: lookups.stats()
+        for lookups in (user_lookups, token_version_lookups, user_batch_loader)
+    }
+
+
+async def _load_user(username: str) -> User | None:
+    if settings.USER_LOOKUP_BATCH_WINDOW_MS > 0:
+        return await user_batch_loader.load(username)
+    if settings.USER_LOOKUP_COALESCING:
+        return await user_lookups.do(username, find_public_user, username)
+    return await find_public_user(username=username)
+
 
 async def get_user(username: str) -> User | None:
     """
-    Get user by username
+    Get user by username, served from the principal cache when possible
     """
-    user = await find_user_by_username(username=username)
-    return User(**user.model_dump(exclude={"hashed_password"})) if user else None
+    cached_user = user_cache.get(username)
+    if cached_user is not None:
+        return cached_user
+    generation = user_cache.generation
+    user = await _load_user(username=username)
+    if user is not None:
+        user_cache.set(username, user, generation=generation)
+    return user
+
+
+async def get_token_version(username: str) -> int | None:
+    """
+    Get the current token version of a user, served from cache when possible
+    """
+    token_version = token_version_cache.get(username)
+    if token_version is not None:
+        return token_version
+    # A password change during the lookup invalidates the cache: the version
+    # read before it must then neither be cached nor shared with later callers.
+    generation = token_version_cache.generation
+    if settings.USER_LOOKUP_COALESCING:
+        token_version = await token_version_lookups.do(
+            (username, generation), find_token_version, username
+        )
+    else:
+        token_version = await find_token_version(username=username)
+    if token_version is not None:
+        token_version_cache.set(username, token_version, generation=generation)
+    return token_version
 
 
 async def get_user_in_db(username: str) -> UserInDB | None:
     """
-    Get user by username from the database
+    Get user with its credentials by username from the database
     """
-    return await find_user_by_username(username=username)
+    return await find_credentials(username=username)
 
 
 async def create_user(user: UserCreate) -> User | None:
     """
     Create user in the database
     """
-    hashed_password = get_password_hash(password=user.password)
-    user_in_db = UserInDB(
+    hashed_password = await hash_password_async(password=user.password)
+    # The request body was validated already, so skip validating it again.
+    user_in_db = UserInDB.model_construct(
         **user.model_dump(exclude={"password"}), hashed_password=hashed_password
     )
     created_user = await insert_user(user=user_in_db)
-    return (
-        User(**created_user.model_dump(exclude={"hashed_password"}))
-        if created_user
-        else None
-    )
+    return created_user.to_user() if created_user else None
 
 
-async def change_password(user: User, new_password: str) -> User | None:
+async def rehash_password(user: UserInDB, hashed_password: str) -> UserInDB | None:
     """
-    Change user password
+    Store a password hash recomputed with the current argon2 parameters. Returns
+    None when the password was changed since the user was loaded
     """
-    hashed_password = get_password_hash(password=new_password)
-    user_in_db = UserInDB(
-        **user.model_dump(exclude={"password"}), hashed_password=hashed_password
+    # Only the hash is written, and only over the one that was verified, so a
+    # concurrent password change is never rolled back.
+    updated = await update_password_hash(
+        username=user.username,
+        old_hashed_password=user.hashed_password,
+        hashed_password=hashed_password,
     )
-    updated_user = await update_user(user=user_in_db)
-    return (
-        User(**updated_user.model_dump(exclude={"hashed_password"}))
-        if updated_user
-        else None
+    if not updated:
+        return None
+    return user.model_copy(update={"hashed_password": hashed_password})
+
+
+async def change_password(user: UserInDB, new_password: str) -> User | None:
+    """
+    Change user password, revoking every token issued before the change. Returns
+    None when the stored password no longer matches the loaded one
+    """
+    hashed_password = await hash_password_async(password=new_password)
+    updated = await update_user_password(
+        username=user.username,
+        old_hashed_password=user.hashed_password,
+        hashed_password=hashed_password,
     )
+    user_cache.invalidate(user.username)
+    token_version_cache.invalidate(user.username)
+    if not updated:
+        return None
+    token_version_cache.set(user.username, user.token_version + 1)
+    return user.to_user()
@@ -0,0 +1,253 @@
+import asyncio
+import csv
+import json
+import math
+from collections.abc import AsyncIterable, AsyncIterator
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+from typing import Any, Literal
+
+from core.config import settings
+from core.cpu import cpus_per_worker
+from core.security import (
+    configure_password_hash,
+    get_password_hashes,
+    password_hash_params,
+)
+from pydantic import ValidationError
+from repositories.user import DuplicateUserError, insert_users
+from schemas.user import UserCreate, UserImportError, UserImportReport, UserInDB
+
+ImportFormat = Literal["ndjson", "csv"]
+
+
+def _validation_message(err: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(loc) for loc in error['loc']) or 'row'}: {error['msg']}"
+        for error in err.errors()
+    )
+
+
+class UserImporter:
+    """
+    Validate, hash and insert users read from a byte stream, one batch at a
+    time, so memory stays bounded by the batch size whatever the input size
+    """
+
+    def __init__(
+        self, batch_size: int, max_errors: int, max_line_bytes: int, hash_workers: int
+    ):
+        self.batch_size = batch_size
+        self.max_errors = max_errors
+        self.max_line_bytes = max_line_bytes
+        self.hash_workers = hash_workers
+        self.report = UserImportReport()
+
+    def add_error(self, line: int, username: str | None, error: str) -> None:
+        """
+        Count a rejected row, keeping its details up to max_errors rows
+        """
+        self.report.failed += 1
+        if len(self.report.errors) < self.max_errors:
+            self.report.errors.append(
+                UserImportError(line=line, username=username, error=error)
+            )
+        else:
+            self.report.errors_truncated = True
+
+    def _decode(self, line_number: int, line: bytearray) -> str | None:
+        try:
+            text = line.decode("utf-8").removesuffix("\r")
+        except UnicodeDecodeError:
+            self.add_error(line_number, None, "Line is not valid UTF-8")
+            return None
+        return text.removeprefix("\ufeff") if line_number == 1 else text
+
+    async def lines(
+        self, chunks: AsyncIterable[bytes]
+    ) -> AsyncIterator[tuple[int, str]]:
+        """
+        Split a byte stream into numbered lines, skipping lines longer than
+        max_line_bytes without buffering them
+        """
+        buffer = bytearray()
+        line_number = 0
+        skipping = False
+        async for chunk in chunks:
+            start = 0
+            while True:
+                end = chunk.find(b"\n", start)
+                if not skipping:
+                    buffer += chunk[start:] if end == -1 else chunk[start:end]
+                    if len(buffer) > self.max_line_bytes:
+                        self.add_error(
+                            line_number + 1,
+                            None,
+                            f"Line is longer than {self.max_line_bytes} bytes",
+                        )
+                        buffer.clear()
+                        skipping = True
+                if end == -1:
+                    break
+                line_number += 1
+                start = end + 1
+                if skipping:
+                    skipping = False
+                    continue
+                line = self._decode(line_number, buffer)
+                buffer.clear()
+                if line is not None:
+                    yield line_number, line
+        if buffer:
+            line_number += 1
+            line = self._decode(line_number, buffer)
+            if line is not None:
+                yield line_number, line
+
+    async def ndjson_rows(
+        self, lines: AsyncIterable[tuple[int, str]]
+    ) -> AsyncIterator[tuple[int, Any]]:
+        """
+        Parse one JSON object per line, skipping blank lines
+        """
+        async for line_number, line in lines:
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as err:
+                self.add_error(line_number, None, f"Invalid JSON: {err.msg}")
+                continue
+            yield line_number, row
+
+    async def csv_rows(
+        self, lines: AsyncIterable[tuple[int, str]]
+    ) -> AsyncIterator[tuple[int, Any]]:
+        """
+        Parse CSV lines with a header row, leaving empty fields out. Quoted
+        fields cannot span lines
+        """
+        header: list[str] | None = None
+        async for line_number, line in lines:
+            if not line.strip():
+                continue
+            try:
+                values = next(csv.reader([line]))
+            except csv.Error as err:
+                self.add_error(line_number, None, f"Invalid CSV: {err}")
+                continue
+            if header is None:
+                header = [name.strip() for name in values]
+                continue
+            if len(values) != len(header):
+                self.add_error(
+                    line_number,
+                    None,
+                    f"Expected {len(header)} fields, got {len(values)}",
+                )
+                continue
+            yield (
+                line_number,
+                {
+                    name: value
+                    for name, value in zip(header, values, strict=True)
+                    if value
+                },
+            )
+
+    async def run(self, rows: AsyncIterable[tuple[int, Any]]) -> UserImportReport:
+        """
+        Import parsed rows in batches, hashing passwords on a process pool
+        """
+        executor = ProcessPoolExecutor(
+            max_workers=self.hash_workers,
+            initializer=configure_password_hash,
+            initargs=(
+                password_hash_params["time_cost"],
+                password_hash_params["memory_cost"],
+                password_hash_params["parallelism"],
+            ),
+        )
+        try:
+            batch: list[tuple[int, UserCreate]] = []
+            async for line_number, row in rows:
+                try:
+                    user = UserCreate.model_validate(row)
+                except ValidationError as err:
+                    username = row.get("username") if isinstance(row, dict) else None
+                    self.add_error(
+                        line_number,
+                        username if isinstance(username, str) else None,
+                        _validation_message(err),
+                    )
+                    continue
+                batch.append((line_number, user))
+                if len(batch) >= self.batch_size:
+                    await self._insert_batch(executor, batch)
+                    batch = []
+            if batch:
+                await self._insert_batch(executor, batch)
+        finally:
+            await asyncio.to_thread(executor.shutdown, cancel_futures=True)
+        return self.report
+
+    async def _insert_batch(
+        self, executor: ProcessPoolExecutor, batch: list[tuple[int, UserCreate]]
+    ) -> None:
+        passwords = [user.password for _, user in batch]
+        # One job per worker keeps the pickling overhead per batch constant.
+        chunk_size = math.ceil(len(passwords) / self.hash_workers)
+        loop = asyncio.get_running_loop()
+        hashed_chunks = await asyncio.gather(
+            *(
+                loop.run_in_executor(
+                    executor, get_password_hashes, passwords[i : i + chunk_size]
+                )
+                for i in range(0, len(passwords), chunk_size)
+            )
+        )
+        users = [
+            UserInDB.model_construct(
+                **user.model_dump(exclude={"password"}), hashed_password=hashed_password
+            )
+            for (_, user), hashed_password in zip(
+                batch, chain.from_iterable(hashed_chunks), strict=True
+            )
+        ]
+        inserted, errors = await insert_users(users=users)
+        self.report.inserted += inserted
+        for index, err in sorted(errors.items()):
+            line_number, user = batch[index]
+            message = (
+                f"{err.field.capitalize()} already exists"
+                if isinstance(err, DuplicateUserError)
+                else str(err)
+            )
+            self.add_error(line_number, user.username, message)
+
+
+async def import_users(
+    chunks: AsyncIterable[bytes],
+    import_format: ImportFormat,
+    hash_workers: int | None = None,
+) -> UserImportReport:
+    """
+    Import users from an NDJSON or CSV byte stream. Passwords are hashed on
+    USER_IMPORT_HASH_WORKERS processes, by default this server worker's share
+    of the CPUs so that an import does not starve the other workers' logins
+    """
+    importer = UserImporter(
+        batch_size=settings.USER_IMPORT_BATCH_SIZE,
+        max_errors=settings.USER_IMPORT_MAX_ERRORS,
+        max_line_bytes=settings.USER_IMPORT_MAX_LINE_BYTES,
+        hash_workers=hash_workers
+        or settings.USER_IMPORT_HASH_WORKERS
+        or cpus_per_worker(settings.SERVER_WORKERS),
+    )
+    lines = importer.lines(chunks)
+    rows = (
+        importer.csv_rows(lines)
+        if import_format == "csv"
+        else importer.ndjson_rows(lines)
+    )
+    return await importer.run(rows)
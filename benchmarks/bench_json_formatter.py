@@ -0,0 +1,88 @@
+"""Benchmark the JsonFormatter against the previous json.dumps implementation.
+
+Run from the repository root:
+
+    uv run python benchmarks/bench_json_formatter.py
+"""
+
+import json
+import logging
+import sys
+import time
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "app"))
+
+# ruff: noqa: E402
+from core.logger import _EXTRA_LOG_FIELDS, JsonFormatter
+
+RECORDS = 200_000
+
+
+class StdlibJsonFormatter(logging.Formatter):
+    """The previous formatter, timestamped with the record creation time."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        log_data: dict[str, Any] = {
+            "timestamp": datetime.fromtimestamp(record.created, UTC).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "module": record.module,
+            "function": record.funcName,
+            "line": record.lineno,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            log_data["exception"] = self.formatException(record.exc_info)
+        for field in _EXTRA_LOG_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                log_data[field] = value
+        return json.dumps(log_data, default=str)
+
+
+def make_record(created: float) -> logging.LogRecord:
+    record = logging.LogRecord(
+        name="middlewares.logging",
+        level=logging.INFO,
+        pathname=__file__,
+        lineno=42,
+        msg="Request completed: %s %s - %s",
+        args=("GET", "/api/v1/me", 200),
+        exc_info=None,
+        func="__call__",
+    )
+    record.created = created
+    record.request_id = "0b6f2d0e-8a59-4c1c-9b8e-1d0c4d3f5a77"
+    record.method = "GET"
+    record.path = "/api/v1/me"
+    record.status_code = 200
+    record.duration_ms = 1.23
+    return record
+
+
+def bench(formatter: logging.Formatter, records: list[logging.LogRecord]) -> float:
+    start = time.perf_counter()
+    for record in records:
+        formatter.format(record)
+    return (time.perf_counter() - start) / len(records) * 1_000_000
+
+
+def main() -> None:
+    now = time.time()
+    # Roughly a thousand records per second, like a busy worker.
+    records = [make_record(now + i / 1000) for i in range(RECORDS)]
+    legacy, fast = StdlibJsonFormatter(), JsonFormatter()
+    for record in records[:1000] + [make_record(float(int(now)))]:
+        assert json.loads(legacy.format(record)) == json.loads(fast.format(record))
+    legacy_us = bench(legacy, records)
+    fast_us = bench(fast, records)
+    print(f"json.dumps formatter {legacy_us:8.2f} us/record")
+    print(f"JsonFormatter        {fast_us:8.2f} us/record")
+    print(f"speedup              {legacy_us / fast_us:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Benchmark the pure ASGI LoggingMiddleware against a BaseHTTPMiddleware version.
+
+Run from the repository root:
+
+    uv run python benchmarks/bench_logging_middleware.py
+"""
+
+import asyncio
+import logging
+import sys
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "app"))
+
+# ruff: noqa: E402
+from middlewares.logging import LoggingMiddleware
+from starlette.applications import Starlette
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+REQUESTS = 20_000
+
+logger = logging.getLogger("middlewares.logging")
+
+
+class BaseHTTPLoggingMiddleware(BaseHTTPMiddleware):
+    """The previous BaseHTTPMiddleware implementation, kept for comparison."""
+
+    async def dispatch(self, request: Request, call_next):
+        request_id = str(uuid.uuid4())
+        method = request.method
+        path = request.url.path
+        client_host = request.client.host if request.client else "unknown"
+        logger.info(
+            f"Incoming request: {method} {path}",
+            extra={
+                "request_id": request_id,
+                "method": method,
+                "path": path,
+                "client_host": client_host,
+                "query_params": str(request.query_params),
+            },
+        )
+        start_time = time.time()
+        response = await call_next(request)
+        process_time = (time.time() - start_time) * 1000
+        response.headers["X-Request-ID"] = request_id
+        logger.info(
+            f"Request completed: {method} {path} - {response.status_code}",
+            extra={
+                "request_id": request_id,
+                "method": method,
+                "path": path,
+                "status_code": response.status_code,
+                "duration_ms": round(process_time, 2),
+            },
+        )
+        return response
+
+
+async def me(request: Request) -> JSONResponse:
+    return JSONResponse({"username": "bench", "email": "bench@example.com"})
+
+
+def build_app(middleware_class) -> Starlette:
+    app = Starlette(routes=[Route("/api/v1/me", me)])
+    app.add_middleware(middleware_class)
+    return app
+
+
+async def run(app: Starlette) -> float:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/api/v1/me",
+        "raw_path": b"/api/v1/me",
+        "query_string": b"",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 12345),
+        "server": ("bench", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    for _ in range(1000):
+        await app(dict(scope), receive, send)
+    start = time.perf_counter()
+    for _ in range(REQUESTS):
+        await app(dict(scope), receive, send)
+    return (time.perf_counter() - start) / REQUESTS * 1_000_000
+
+
+def main() -> None:
+    # Measure the middleware itself, not the cost of writing log lines.
+    logger.addHandler(logging.NullHandler())
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    for name, middleware_class in (
+        ("BaseHTTPMiddleware", BaseHTTPLoggingMiddleware),
+        ("pure ASGI", LoggingMiddleware),
+    ):
+        micros = asyncio.run(run(build_app(middleware_class)))
+        print(f"{name:<20} {micros:8.1f} us/request")
+
+
+if __name__ == "__main__":
+    main()
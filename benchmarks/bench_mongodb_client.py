@@ -0,0 +1,103 @@
+"""Compare Motor with PyMongo's native AsyncMongoClient under concurrent load.
+
+Motor is no longer a dependency, so add it for the run. From the repository
+root, with MongoDB running and the `.env` file in place:
+
+    uv run --with motor==3.7.1 python benchmarks/bench_mongodb_client.py
+
+Both clients run the same projected ``find_one`` by username, the query of
+the authentication path, from ``--concurrency`` tasks. The script reports
+per-operation latency percentiles and the CPU time of this process per
+operation; Motor's CPU includes the executor threads it hands every
+operation to. It writes to a ``bench_users`` collection and drops it after.
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "app"))
+
+# ruff: noqa: E402
+from core.config import settings
+from pymongo import AsyncMongoClient
+
+USERS = 1_000
+PROJECTION = {"_id": 0, "username": 1, "email": 1}
+
+
+async def run(client, operations: int, concurrency: int) -> dict[str, float]:
+    collection = client[settings.MONGO_INITDB_DATABASE]["bench_users"]
+    await collection.find_one({"username": "user-0"}, projection=PROJECTION)
+    latencies: list[float] = []
+
+    async def worker(offset: int) -> None:
+        for i in range(offset, operations, concurrency):
+            start = time.perf_counter()
+            await collection.find_one(
+                {"username": f"user-{i % USERS}"}, projection=PROJECTION
+            )
+            latencies.append(time.perf_counter() - start)
+
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    await asyncio.gather(*(worker(offset) for offset in range(concurrency)))
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {
+        "ops_per_second": operations / wall,
+        "p50_ms": quantiles[49] * 1000,
+        "p99_ms": quantiles[98] * 1000,
+        "cpu_us_per_op": cpu / operations * 1_000_000,
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    setup = AsyncMongoClient(settings.ME_CONFIG_MONGODB_URL)
+    collection = setup[settings.MONGO_INITDB_DATABASE]["bench_users"]
+    await collection.drop()
+    await collection.insert_many(
+        [
+            {"username": f"user-{i}", "email": f"user-{i}@example.com"}
+            for i in range(USERS)
+        ]
+    )
+    await collection.create_index("username", unique=True)
+
+    clients = {"AsyncMongoClient": AsyncMongoClient}
+    try:
+        from motor.motor_asyncio import AsyncIOMotorClient
+
+        clients = {"Motor": AsyncIOMotorClient, **clients}
+    except ImportError:
+        print("Motor is not installed, run with `uv run --with motor==3.7.1`")
+
+    try:
+        for _ in range(args.rounds):
+            for name, client_class in clients.items():
+                client = client_class(settings.ME_CONFIG_MONGODB_URL)
+                result = await run(client, args.operations, args.concurrency)
+                closed = client.close()
+                if asyncio.iscoroutine(closed):
+                    await closed
+                print(
+                    f"{name:>16}: {result['ops_per_second']:8,.0f} ops/s  "
+                    f"p50 {result['p50_ms']:6.2f} ms  "
+                    f"p99 {result['p99_ms']:6.2f} ms  "
+                    f"{result['cpu_us_per_op']:6.1f} µs CPU/op"
+                )
+    finally:
+        await collection.drop()
+        await setup.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--operations", type=int, default=50_000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=3)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,127 @@
+"""Benchmark JSON response rendering for the /me, /auth/login and /auth/refresh shapes.
+
+Compares FastAPI's default path, where routes with a return type are
+serialized straight to JSON bytes by Pydantic, with setting a custom default
+response class (JSONResponse, or ORJSONResponse when orjson is installed),
+which goes through jsonable_encoder and a Python dict first. Handlers return
+prebuilt models, so only routing, validation of the return value and
+rendering are measured; argon2 and MongoDB are left out.
+
+Run from the repository root:
+
+    uv run python benchmarks/bench_responses.py
+"""
+
+import asyncio
+import json
+import sys
+import time
+import warnings
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "app"))
+
+# ruff: noqa: E402
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from schemas.user import RefreshToken, Token, User
+
+REQUESTS = 20_000
+ROUNDS = 5
+
+USER = User.model_construct(username="bench", email="bench@example.com")
+TOKEN = Token(access_token="e" * 200, refresh_token="r" * 200, token_type="bearer")
+REFRESH_BODY = json.dumps({"refresh_token": "r" * 200}).encode()
+
+
+def build_app(**kwargs) -> FastAPI:
+    app = FastAPI(**kwargs)
+
+    @app.get("/api/v1/me")
+    async def me() -> User:
+        return USER
+
+    @app.post("/api/v1/auth/login")
+    async def login() -> Token:
+        return TOKEN
+
+    @app.post("/api/v1/auth/refresh")
+    async def refresh(refresh_token_data: RefreshToken) -> Token:
+        return TOKEN
+
+    return app
+
+
+async def run(app: FastAPI, method: str, path: str, body: bytes) -> tuple[float, bytes]:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "headers": [(b"host", b"bench"), (b"content-type", b"application/json")],
+        "client": ("127.0.0.1", 12345),
+        "server": ("bench", 80),
+    }
+    response_body = []
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            response_body.append(message.get("body", b""))
+
+    for _ in range(1000):
+        await app(dict(scope), receive, send)
+    start = time.perf_counter()
+    for _ in range(REQUESTS):
+        await app(dict(scope), receive, send)
+    elapsed = time.perf_counter() - start
+    return REQUESTS / elapsed, response_body[-1]
+
+
+def main() -> None:
+    variants = [
+        ("default (dump_json)", {}),
+        ("JSONResponse", {"default_response_class": JSONResponse}),
+    ]
+    # Recent FastAPI versions deprecate ORJSONResponse in favour of the default.
+    warnings.filterwarnings("ignore", message="ORJSONResponse is deprecated")
+    try:
+        import orjson  # noqa: F401
+        from fastapi.responses import ORJSONResponse
+    except ImportError:
+        pass
+    else:
+        variants.append(("ORJSONResponse", {"default_response_class": ORJSONResponse}))
+    endpoints = [
+        ("GET", "/api/v1/me", b""),
+        ("POST", "/api/v1/auth/login", b""),
+        ("POST", "/api/v1/auth/refresh", REFRESH_BODY),
+    ]
+    apps = [(name, build_app(**kwargs)) for name, kwargs in variants]
+    for method, path, body in endpoints:
+        # Interleave the variants and keep each one's best round to reduce noise.
+        best = dict.fromkeys((name for name, _ in apps), 0.0)
+        bodies = set()
+        for _ in range(ROUNDS):
+            for name, app in apps:
+                requests_per_second, response_body = asyncio.run(
+                    run(app, method, path, body)
+                )
+                best[name] = max(best[name], requests_per_second)
+                bodies.add(json.dumps(json.loads(response_body), sort_keys=True))
+        # Every variant must render the same document.
+        assert len(bodies) == 1, bodies
+        for name, requests_per_second in best.items():
+            print(
+                f"{method:<4} {path:<22} {name:<20} {requests_per_second:10.0f} req/s"
+            )
+
+
+if __name__ == "__main__":
+    main()
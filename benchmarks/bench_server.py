@@ -0,0 +1,97 @@
+"""Measure the throughput and latency of a running server.
+
+Start the server under test, then run from the repository root, for example:
+
+    uv run python app/server.py --port 8000
+    uv run python benchmarks/bench_server.py --base-url http://localhost:8000
+
+    uv run fastapi dev app/main.py --port 8000
+    uv run python benchmarks/bench_server.py --base-url http://localhost:8000
+
+It registers a throwaway user, logs in once and then hammers ``GET /me`` with
+the access token from ``--concurrency`` connections for ``--duration``
+seconds. ``--path /auth/login`` measures argon2-bound logins instead, with
+``RATE_LIMIT_ENABLED="false"`` on the server so they are not throttled. Run the
+load generator on other cores than the server (e.g. ``taskset``), or on
+another host, so both do not compete for the same CPUs.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+import httpx
+
+API_PREFIX = "/api/v1"
+
+
+async def login(client: httpx.AsyncClient) -> dict[str, str]:
+    credentials = {
+        "username": f"bench-{uuid.uuid4().hex[:12]}",
+        "password": "Bench-pass-123!",
+    }
+    response = await client.post(f"{API_PREFIX}/auth/register", json=credentials)
+    response.raise_for_status()
+    response = await client.post(f"{API_PREFIX}/auth/login", data=credentials)
+    response.raise_for_status()
+    return {**credentials, "access_token": response.json()["access_token"]}
+
+
+async def worker(
+    client: httpx.AsyncClient,
+    path: str,
+    user: dict[str, str],
+    deadline: float,
+    latencies: list[float],
+    statuses: dict[int, int],
+) -> None:
+    headers = {"Authorization": f"Bearer {user['access_token']}"}
+    form = {"username": user["username"], "password": user["password"]}
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        if path.endswith("/auth/login"):
+            response = await client.post(f"{API_PREFIX}{path}", data=form)
+        else:
+            response = await client.get(f"{API_PREFIX}{path}", headers=headers)
+        latencies.append(time.perf_counter() - start)
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+
+async def main(args: argparse.Namespace) -> None:
+    limits = httpx.Limits(
+        max_connections=args.concurrency, max_keepalive_connections=args.concurrency
+    )
+    async with httpx.AsyncClient(
+        base_url=args.base_url, limits=limits, timeout=30
+    ) as client:
+        user = await login(client)
+        latencies: list[float] = []
+        statuses: dict[int, int] = {}
+        start = time.perf_counter()
+        deadline = start + args.duration
+        await asyncio.gather(
+            *(
+                worker(client, args.path, user, deadline, latencies, statuses)
+                for _ in range(args.concurrency)
+            )
+        )
+        elapsed = time.perf_counter() - start
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(f"{args.base_url}{API_PREFIX}{args.path}, {args.concurrency} connections")
+    print(f"  requests:   {len(latencies)} in {elapsed:.1f} s ({statuses})")
+    print(f"  throughput: {len(latencies) / elapsed:,.0f} req/s")
+    print(
+        f"  latency:    p50 {quantiles[49] * 1000:.2f} ms, "
+        f"p99 {quantiles[98] * 1000:.2f} ms"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--path", default="/me")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=30.0)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,76 @@
+"""Benchmark hydrating user documents with and without Pydantic validation.
+
+Run from the repository root:
+
+    uv run python benchmarks/bench_user_hydration.py
+"""
+
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "app"))
+
+# ruff: noqa: E402
+from schemas.user import User, UserInDB
+
+ITERATIONS = 100_000
+
+DOCUMENT = {
+    "username": "alice",
+    "email": "alice@example.com",
+    "hashed_password": "$argon2id$v=19$m=65536,t=3,p=4$c2FsdHNhbHQ$aGFzaGhhc2hoYXNo",
+    "token_version": 3,
+}
+PUBLIC_DOCUMENT = {"username": "alice", "email": "alice@example.com"}
+
+
+def validated_get_user(document: dict[str, Any]) -> User:
+    """The previous get_user path: full document, UserInDB, then User."""
+    user = UserInDB(**document)
+    return User(**user.model_dump(exclude={"hashed_password"}))
+
+
+def hydrated_get_user(document: dict[str, Any]) -> User:
+    """The current get_user path: projected document into User."""
+    return User.from_document(document)
+
+
+def validated_login(document: dict[str, Any]) -> User:
+    """The previous credentials read followed by the public conversion."""
+    user = UserInDB(**document)
+    return User(**user.model_dump(exclude={"hashed_password"}))
+
+
+def hydrated_login(document: dict[str, Any]) -> User:
+    """The current credentials read followed by the public conversion."""
+    return UserInDB.from_document(document).to_user()
+
+
+def bench(func: Callable[[dict[str, Any]], User], document: dict[str, Any]) -> float:
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        func(document)
+    return (time.perf_counter() - start) / ITERATIONS * 1_000_000
+
+
+def main() -> None:
+    assert validated_get_user(DOCUMENT) == hydrated_get_user(PUBLIC_DOCUMENT)
+    assert validated_login(DOCUMENT) == hydrated_login(DOCUMENT)
+    cases = [
+        ("get_user", validated_get_user, DOCUMENT, hydrated_get_user, PUBLIC_DOCUMENT),
+        ("credentials", validated_login, DOCUMENT, hydrated_login, DOCUMENT),
+    ]
+    for name, before, before_document, after, after_document in cases:
+        before_us = bench(before, before_document)
+        after_us = bench(after, after_document)
+        print(
+            f"{name:<12} validated {before_us:6.2f} us  "
+            f"hydrated {after_us:6.2f} us  speedup {before_us / after_us:5.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
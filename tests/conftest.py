@@ -1,9 +1,12 @@
 from collections.abc import Generator
 
 import pytest
+from core.ratelimit import MemoryRateLimitStore
 from faker import Faker
 from fastapi.testclient import TestClient
 from pymongo import MongoClient
+from services.auth import rate_limit_store
+from services.user import token_version_cache, user_cache
 
 from app.core.config import settings
 from app.core.constants import API_PREFIX
@@ -18,6 +21,8 @@ def clean_database():
 
     This fixture runs automatically before each test to ensure
     a clean database state. Uses sync pymongo client for compatibility.
+    In-process caches and rate limit buckets are cleared as well so they
+    never outlive the data.
     """
     client = MongoClient(settings.ME_CONFIG_MONGODB_URL)
     db = client[settings.MONGO_INITDB_DATABASE]
@@ -26,6 +31,10 @@ def clean_database():
         if not collection_name.startswith("system."):
             db[collection_name].delete_many({})
     client.close()
+    user_cache.clear()
+    token_version_cache.clear()
+    if isinstance(rate_limit_store, MemoryRateLimitStore):
+        rate_limit_store.clear()
 
 
 @pytest.fixture(scope="function")
@@ -0,0 +1,168 @@
+import json
+
+import pytest
+from core.config import settings
+from faker import Faker
+from pymongo.errors import BulkWriteError
+from repositories import user as user_repository
+from services.user_import import import_users as run_import
+
+from app.core.constants import API_PREFIX
+
+fake = Faker(locale="es_ES")
+
+# Endpoint paths
+import_users = f"{API_PREFIX}/admin/users/import"
+
+
+def new_user() -> dict:
+    """Build valid user data for an import row."""
+    return {
+        "username": fake.unique.user_name(),
+        "email": fake.unique.email(),
+        "password": fake.password(
+            length=16, special_chars=True, digits=True, upper_case=True, lower_case=True
+        ),
+    }
+
+
+@pytest.fixture(scope="function")
+def admin_client(monkeypatch, authenticated_client, registered_user):
+    """Make the registered user an administrator and hash on two workers."""
+    monkeypatch.setattr(settings, "ADMIN_USERNAMES", [registered_user["username"]])
+    monkeypatch.setattr(settings, "USER_IMPORT_HASH_WORKERS", 2)
+    return authenticated_client
+
+
+# ============================================================================
+# USER IMPORT TESTS
+# ============================================================================
+
+
+def test_import_users_ndjson(admin_client, registered_user):
+    """Test importing users from an NDJSON body.
+
+    Verifies:
+    - Returns 200 with an import report
+    - Valid rows are inserted and can log in
+    - Duplicates, invalid JSON and invalid rows are reported by line
+    """
+    users = [new_user(), new_user()]
+    duplicate = {**new_user(), "username": registered_user["username"]}
+    body = "\n".join(
+        [
+            json.dumps(users[0]),
+            json.dumps(duplicate),
+            "{not json",
+            "",
+            json.dumps({**new_user(), "email": "not-an-email"}),
+            json.dumps(users[1]),
+        ]
+    )
+    response = admin_client.post(
+        url=import_users,
+        content=body.encode(),
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    data = response.json()
+    assert response.status_code == 200, f"Error: {data}"
+    assert data["inserted"] == 2
+    assert data["failed"] == 3
+    assert not data["errors_truncated"]
+    errors = {error["line"]: error for error in data["errors"]}
+    assert errors.keys() == {2, 3, 5}
+    assert errors[2]["username"] == registered_user["username"]
+    assert errors[2]["error"] == "Username already exists"
+    assert errors[3]["error"].startswith("Invalid JSON")
+    assert errors[5]["error"].startswith("email")
+
+    response = admin_client.post(
+        url=f"{API_PREFIX}/auth/login",
+        data={"username": users[1]["username"], "password": users[1]["password"]},
+    )
+    assert response.status_code == 200, f"Login failed: {response.json()}"
+
+
+def test_import_users_csv(admin_client):
+    """Test importing users from a CSV body with a header row.
+
+    Verifies:
+    - The format is taken from the query parameter
+    - Rows with a wrong number of fields are reported
+    """
+    users = [new_user(), new_user()]
+    rows = ["username,email,password"]
+    rows += [
+        f'{user["username"]},{user["email"]},"{user["password"]}"' for user in users
+    ]
+    rows.append("only-a-username")
+    response = admin_client.post(
+        url=import_users,
+        params={"format": "csv"},
+        content="\r\n".join(rows).encode(),
+    )
+    data = response.json()
+    assert response.status_code == 200, f"Error: {data}"
+    assert data["inserted"] == 2
+    assert data["failed"] == 1
+    assert data["errors"][0]["line"] == 4
+    assert data["errors"][0]["error"] == "Expected 3 fields, got 1"
+
+
+def test_import_users_reports_other_write_errors(client, monkeypatch):
+    """Test importing a batch where the database rejects rows for any reason.
+
+    Verifies:
+    - Write errors other than duplicates are reported per row
+    - The inserted count comes from the bulk write result
+    """
+    monkeypatch.setattr(settings, "USER_IMPORT_HASH_WORKERS", 1)
+    users = [new_user() for _ in range(3)]
+
+    class RejectingCollection:
+        async def insert_many(self, documents, ordered):
+            raise BulkWriteError(
+                {
+                    "nInserted": 1,
+                    "writeErrors": [
+                        {
+                            "index": 0,
+                            "code": 11000,
+                            "errmsg": "E11000 duplicate key error",
+                            "keyPattern": {"email": 1},
+                        },
+                        {
+                            "index": 2,
+                            "code": 121,
+                            "errmsg": "Document failed validation",
+                        },
+                    ],
+                }
+            )
+
+    monkeypatch.setattr(user_repository, "get_collection", RejectingCollection)
+
+    async def chunks():
+        yield "\n".join(json.dumps(user) for user in users).encode()
+
+    report = client.portal.call(run_import, chunks(), "ndjson")
+    assert report.inserted == 1
+    assert report.failed == 2
+    assert [(error.line, error.error) for error in report.errors] == [
+        (1, "Email already exists"),
+        (3, "Document failed validation"),
+    ]
+
+
+def test_import_users_forbidden(authenticated_client):
+    """Test importing users as a regular user.
+
+    Verifies:
+    - Returns 403 for users that are not administrators
+    """
+    response = authenticated_client.post(
+        url=import_users,
+        content=json.dumps(new_user()).encode(),
+    )
+    assert response.status_code == 403
+    assert response.json()["detail"] == "Not enough permissions"
@@ -0,0 +1,175 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+from middlewares import admission
+from middlewares.admission import AdmissionControlMiddleware, AdmissionLimit
+from starlette.responses import PlainTextResponse
+
+from app.core.constants import API_PREFIX
+
+register = f"{API_PREFIX}/auth/register"
+
+
+async def ok_app(scope, receive, send) -> None:
+    """A minimal HTTP-only ASGI application answering 200."""
+    await PlainTextResponse("ok")(scope, receive, send)
+
+
+# ============================================================================
+# ADMISSION LIMIT TESTS
+# ============================================================================
+
+
+def test_admission_limit_queue():
+    """Test the in-flight limit and its wait queue.
+
+    Verifies:
+    - Requests within the limit are admitted immediately
+    - A request over the limit waits and gets the released slot
+    - A request finding the queue full is rejected immediately
+    - A queued request is rejected once the queue timeout passes
+    """
+    limit = AdmissionLimit(
+        name="test", max_in_flight=1, max_queue=1, queue_timeout_seconds=0.05
+    )
+
+    async def scenario():
+        assert await limit.acquire()
+        waiter = asyncio.create_task(limit.acquire())
+        await asyncio.sleep(0)
+        assert limit.stats()["queued"] == 1
+        assert not await limit.acquire()
+        limit.release()
+        assert await waiter
+        assert limit.stats() == {
+            "in_flight": 1,
+            "queued": 0,
+            "max_in_flight": 1,
+            "max_queue": 1,
+        }
+        assert not await limit.acquire()
+        assert limit.stats()["queued"] == 0
+        limit.release()
+        assert limit.in_flight == 0
+
+    asyncio.run(scenario())
+
+
+def test_admission_limit_cancelled_waiter():
+    """Test cancelling a queued request while its slot is being released.
+
+    Verifies:
+    - The cancelled waiter raises CancelledError, not ValueError
+    - The released slot is freed and the queue is left empty
+    """
+    limit = AdmissionLimit(
+        name="test", max_in_flight=1, max_queue=1, queue_timeout_seconds=1
+    )
+
+    async def scenario():
+        assert await limit.acquire()
+        waiter = asyncio.create_task(limit.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        limit.release()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            pass
+        else:
+            raise AssertionError("The waiter was not cancelled")
+        assert limit.stats()["in_flight"] == 0
+        assert limit.stats()["queued"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_saturated_route_class_returns_503():
+    """Test shedding requests for a saturated route class.
+
+    Verifies:
+    - Requests of a class without free slots get 503 with Retry-After
+    - Requests of other classes are still served
+    """
+    app = AdmissionControlMiddleware(
+        app=ok_app,
+        limits={
+            "default": AdmissionLimit("default", 1, 1, 0.05),
+            "auth": AdmissionLimit("auth", 0, 0, 0.05),
+        },
+        route_classes={"/auth": "auth"},
+        max_body_bytes=0,
+        retry_after_seconds=2,
+    )
+    client = TestClient(app=app)
+    response = client.post(url="/auth/login")
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "2"
+    assert client.get(url="/me").status_code == 200
+
+
+def test_rejection_warnings_are_summarised(caplog, monkeypatch):
+    """Test that rejections do not log one warning each.
+
+    Verifies:
+    - Only the first of a burst of rejections logs a warning
+    - The next warning reports every rejection since the previous one
+    """
+    app = AdmissionControlMiddleware(
+        app=ok_app,
+        limits={"default": AdmissionLimit("default", 0, 0, 0.05)},
+        route_classes={},
+        max_body_bytes=0,
+        retry_after_seconds=1,
+    )
+    client = TestClient(app=app)
+    caplog.set_level("WARNING", logger="middlewares.admission")
+    for _ in range(5):
+        assert client.get(url="/me").status_code == 503
+    [record] = caplog.records
+    assert "rejected 1 requests" in record.getMessage()
+
+    monkeypatch.setattr(admission, "_REJECTION_WARNING_INTERVAL_SECONDS", 0.0)
+    assert client.get(url="/me").status_code == 503
+    assert len(caplog.records) == 2
+    assert "rejected 5 requests" in caplog.records[1].getMessage()
+
+
+# ============================================================================
+# REQUEST BODY LIMIT TESTS
+# ============================================================================
+
+
+def test_oversized_body_rejected(client):
+    """Test rejecting a body whose Content-Length exceeds the limit.
+
+    Verifies:
+    - Returns 413 without parsing the body
+    """
+    response = client.post(
+        url=register,
+        content=b"x" * (2 * 1024 * 1024),
+        headers={"Content-Type": "application/json"},
+    )
+    assert response.status_code == 413
+    assert response.json()["detail"] == "Request body too large"
+
+
+def test_oversized_streamed_body_rejected(client):
+    """Test rejecting a body without Content-Length once it exceeds the limit.
+
+    Verifies:
+    - Returns 413 instead of the application's body parsing error
+    """
+
+    def chunks():
+        for _ in range(32):
+            yield b"x" * 64 * 1024
+
+    response = client.post(
+        url=register,
+        content=chunks(),
+        headers={"Content-Type": "application/json"},
+    )
+    assert response.status_code == 413
+    assert response.json()["detail"] == "Request body too large"
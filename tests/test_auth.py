@@ -1,7 +1,31 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import jwt
+import pytest
+from core import config as core_config
+from core import cpu
+from core.jwt import (
+    decode_access_token,
+    decoded_token_cache,
+    encode_token,
+    remove_signing_key,
+)
+from core.metrics import jwt_operations_total
+from core.ratelimit import MemoryRateLimitStore, Rate
+from core.security import PasswordHashPool
 from faker import Faker
+from fastapi import HTTPException
+from pymongo import MongoClient
+from repositories.rate_limit import MongoRateLimitStore
+from services.auth import check_rate_limits
+from services.user import get_user_in_db, rehash_password
 
+from app.core.config import settings
 from app.core.constants import API_PREFIX
 from app.core.jwt import create_access_token, create_refresh_token
+from app.core.security import MIN_ARGON2_MEMORY_COST, build_password_hash
 
 fake = Faker(locale="es_ES")
 
@@ -48,6 +72,23 @@ def test_register_duplicate_username(client, valid_user_data):
     assert "already exists" in duplicate_response.json()["detail"]
 
 
+def test_register_duplicate_email(client, valid_user_data):
+    """Test registering with an email that is already in use.
+
+    Verifies:
+    - Cannot create two users with same email
+    - Returns 400 Bad Request naming the email as the conflict
+    """
+    first_response = client.post(url=register, json=valid_user_data)
+    assert first_response.status_code == 201
+
+    duplicate_response = client.post(
+        url=register, json={**valid_user_data, "username": fake.user_name() + "2"}
+    )
+    assert duplicate_response.status_code == 400
+    assert duplicate_response.json()["detail"] == "Email already exists"
+
+
 def test_register_invalid_email(client, valid_user_data):
     """Test registration with invalid email format.
 
@@ -107,6 +148,19 @@ def test_register_without_email(client):
     assert response.status_code == 201
 
 
+def test_register_several_users_without_email(client):
+    """Test registering more than one user without email.
+
+    Verifies:
+    - Missing emails do not collide on the unique email index
+    """
+    for username in ("first_user", "second_user"):
+        response = client.post(
+            url=register, json={"username": username, "password": fake.password()}
+        )
+        assert response.status_code == 201, response.json()
+
+
 # ============================================================================
 # LOGIN TESTS
 # ============================================================================
@@ -276,3 +330,228 @@ def test_token_contains_correct_username(client, registered_user):
     )
     assert me_response.status_code == 200
     assert me_response.json()["username"] == registered_user["username"]
+
+
+def test_login_rehashes_stale_password_hash(client, registered_user):
+    """Test that login upgrades hashes created with stale argon2 parameters.
+
+    Verifies:
+    - Login succeeds with a hash created with different parameters
+    - The stored hash is rewritten with the current parameters
+    """
+    stale_hash = build_password_hash(
+        time_cost=1, memory_cost=MIN_ARGON2_MEMORY_COST, parallelism=1
+    ).hash(registered_user["password"])
+    mongo_client = MongoClient(settings.ME_CONFIG_MONGODB_URL)
+    users = mongo_client[settings.MONGO_INITDB_DATABASE]["users"]
+    users.update_one(
+        {"username": registered_user["username"]},
+        {"$set": {"hashed_password": stale_hash}},
+    )
+    response = client.post(
+        url=login,
+        data={
+            "username": registered_user["username"],
+            "password": registered_user["password"],
+        },
+    )
+    stored = users.find_one({"username": registered_user["username"]})
+    mongo_client.close()
+    assert response.status_code == 200
+    assert stored is not None
+    assert stored["hashed_password"] != stale_hash
+
+
+def test_rehash_keeps_concurrent_password_change(client, registered_user):
+    """Test that a rehash does not overwrite a password changed meanwhile.
+
+    Verifies:
+    - The rehash is skipped when the stored hash changed after the user was loaded
+    - The new hash and token version are kept
+    """
+    user = client.portal.call(get_user_in_db, registered_user["username"])
+    mongo_client = MongoClient(settings.ME_CONFIG_MONGODB_URL)
+    users = mongo_client[settings.MONGO_INITDB_DATABASE]["users"]
+    users.update_one(
+        {"username": registered_user["username"]},
+        {"$set": {"hashed_password": "changed"}, "$inc": {"token_version": 1}},
+    )
+    rehashed = client.portal.call(rehash_password, user, "rehashed")
+    stored = users.find_one({"username": registered_user["username"]})
+    mongo_client.close()
+    assert rehashed is None
+    assert stored is not None
+    assert stored["hashed_password"] == "changed"
+    assert stored["token_version"] == user.token_version + 1
+
+
+# ============================================================================
+# TOKEN DECODE CACHE TESTS
+# ============================================================================
+
+
+def test_access_token_decode_is_cached():
+    """Test that a verified access token payload is reused.
+
+    Verifies:
+    - The second decode is served from the cache
+    - Callers get copies, so mutating one does not change the cache
+    """
+    token = create_access_token(data={"sub": fake.user_name()})
+    cached = jwt_operations_total.labels("decode", "cached")
+    before = cached.value
+    payload = decode_access_token(token)
+    payload["sub"] = "changed"
+    assert decode_access_token(token)["sub"] != "changed"
+    assert cached.value - before == 1
+
+
+def test_cached_access_token_expires_with_token():
+    """Test that a cached payload is dropped when its token expires.
+
+    Verifies:
+    - A decode after `exp` verifies the token again and rejects it
+    """
+    token = encode_token({"sub": fake.user_name(), "exp": int(time.time()) + 1})
+    decode_access_token(token)
+    time.sleep(max(0.0, int(time.time()) + 1 - time.time()) + 0.1)
+    with pytest.raises(jwt.ExpiredSignatureError):
+        decode_access_token(token)
+
+
+def test_removing_signing_key_clears_decode_cache():
+    """Test that removing a signing key forgets the verified payloads.
+
+    Verifies:
+    - The decode cache is emptied
+    """
+    decode_access_token(create_access_token(data={"sub": fake.user_name()}))
+    assert len(decoded_token_cache) > 0
+    remove_signing_key(kid="unknown")
+    assert len(decoded_token_cache) == 0
+
+
+# ============================================================================
+# RATE LIMIT TESTS
+# ============================================================================
+
+
+def test_login_rate_limited_per_username(client, registered_user):
+    """Test that repeated login attempts for a username are throttled.
+
+    Verifies:
+    - Attempts within the burst are processed
+    - Further attempts return 429 with Retry-After, even with the right password
+    """
+    for _ in range(settings.RATE_LIMIT_USERNAME_IP_BURST):
+        response = client.post(
+            url=login,
+            data={"username": registered_user["username"], "password": "wrong"},
+        )
+        assert response.status_code == 401
+    response = client.post(
+        url=login,
+        data={
+            "username": registered_user["username"],
+            "password": registered_user["password"],
+        },
+    )
+    assert response.status_code == 429
+    assert int(response.headers["retry-after"]) >= 1
+
+
+def test_username_rate_limit_from_one_ip_spares_other_ips(client):
+    """Test that exhausting a username bucket from one IP spares other IPs.
+
+    Verifies:
+    - Attempts over the per username and IP burst from one IP get 429
+    - The same username can still be tried from another IP
+    """
+    username = fake.user_name()
+    for _ in range(settings.RATE_LIMIT_USERNAME_IP_BURST):
+        client.portal.call(check_rate_limits, "login", username, "203.0.113.1")
+    for _ in range(settings.RATE_LIMIT_USERNAME_BURST):
+        with pytest.raises(HTTPException) as exc_info:
+            client.portal.call(check_rate_limits, "login", username, "203.0.113.1")
+        assert exc_info.value.status_code == 429
+    client.portal.call(check_rate_limits, "login", username, "203.0.113.2")
+
+
+def test_username_rate_limit_across_ips(client):
+    """Test that guesses against one account from many IPs are limited.
+
+    Verifies:
+    - Attempts over the per username burst get 429, one attempt per IP
+    """
+    username = fake.user_name()
+    for i in range(settings.RATE_LIMIT_USERNAME_BURST):
+        client.portal.call(check_rate_limits, "login", username, f"203.0.113.{i}")
+    with pytest.raises(HTTPException) as exc_info:
+        client.portal.call(check_rate_limits, "login", username, "198.51.100.1")
+    assert exc_info.value.status_code == 429
+
+
+def test_memory_rate_limit_store_evicts_least_recent_key():
+    """Test the bounds of the in-memory rate limit store.
+
+    Verifies:
+    - Hits beyond the burst are rejected with the time to wait
+    - The least recently hit key is evicted above max_keys
+    """
+    store = MemoryRateLimitStore(max_keys=2)
+    rate = Rate(per_minute=60, burst=1)
+
+    async def hit_keys():
+        return [await store.hit(key, rate) for key in ("a", "a", "b", "c")]
+
+    waits = asyncio.run(hit_keys())
+    assert waits[0] == 0 and waits[2] == 0 and waits[3] == 0
+    assert 0 < waits[1] <= 1
+    assert len(store) == 2 and store.evictions == 1
+
+
+def test_mongodb_rate_limit_store(client):
+    """Test the rate limit store shared through MongoDB.
+
+    Verifies:
+    - Hits within the burst are allowed
+    - The next hit is rejected with the time to wait
+    - The bucket document expires through the TTL index
+    """
+    store = MongoRateLimitStore()
+    rate = Rate(per_minute=60, burst=2)
+    waits = [client.portal.call(store.hit, "login:ip:test", rate) for _ in range(3)]
+    assert waits[:2] == [0, 0]
+    assert 0 < waits[2] <= 1
+    mongo_client = MongoClient(settings.ME_CONFIG_MONGODB_URL)
+    bucket = mongo_client[settings.MONGO_INITDB_DATABASE]["rate_limits"].find_one(
+        {"_id": "login:ip:test"}
+    )
+    mongo_client.close()
+    assert bucket is not None and "expires_at" in bucket
+
+
+# ============================================================================
+# PASSWORD HASH POOL TESTS
+# ============================================================================
+
+
+def test_password_hash_pool_shares_cpus_between_workers(monkeypatch):
+    """Test the default size of the password hashing pool.
+
+    Verifies:
+    - Each server worker gets its share of the available CPUs
+    - An explicit PASSWORD_HASH_WORKERS is used as is
+    """
+    monkeypatch.setattr(cpu, "available_cpus", lambda: 8)
+    monkeypatch.setattr(core_config.settings, "PASSWORD_HASH_EXECUTOR", "thread")
+    monkeypatch.setattr(core_config.settings, "SERVER_WORKERS", 4)
+    for hash_workers, expected in ((0, 2), (3, 3)):
+        monkeypatch.setattr(core_config.settings, "PASSWORD_HASH_WORKERS", hash_workers)
+        pool = PasswordHashPool()
+        pool.start()
+        try:
+            assert isinstance(pool.executor, ThreadPoolExecutor)
+            assert pool.executor._max_workers == expected
+        finally:
+            pool.shutdown()
@@ -0,0 +1,97 @@
+from types import SimpleNamespace
+
+from core import cache as cache_module
+from core.cache import TTLCache
+
+
+class FakeClock:
+    """A monotonic clock the test moves forward by hand."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def use_fake_clock(monkeypatch) -> FakeClock:
+    """Make the cache read the time from a fake clock."""
+    clock = FakeClock()
+    monkeypatch.setattr(cache_module, "time", SimpleNamespace(monotonic=clock))
+    return clock
+
+
+# ============================================================================
+# TTL CACHE TESTS
+# ============================================================================
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    """Test per-entry expiry.
+
+    Verifies:
+    - An entry is served until its TTL passes, then it is a miss and removed
+    - A per-entry TTL overrides the cache TTL
+    - Entries with a TTL of zero or less are not stored
+    """
+    clock = use_fake_clock(monkeypatch)
+    cache = TTLCache(max_size=10, ttl_seconds=60)
+    cache.set("user", "alice")
+    cache.set("short", "bob", ttl_seconds=5)
+    cache.set("expired", "carol", ttl_seconds=0)
+    assert cache.get("user") == "alice"
+    assert cache.get("short") == "bob"
+    assert cache.get("expired") is None
+
+    clock.now += 5
+    assert cache.get("short", default="miss") == "miss"
+    assert cache.get("user") == "alice"
+    clock.now += 55
+    assert cache.get("user") is None
+    assert len(cache) == 0
+    assert cache.stats() == {"size": 0, "hits": 3, "misses": 3, "evictions": 0}
+
+
+def test_least_recently_used_entry_evicted():
+    """Test LRU eviction above max_size.
+
+    Verifies:
+    - Reading an entry makes it the most recently used
+    - The least recently used entry is evicted and counted
+    """
+    cache = TTLCache(max_size=2, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.evictions == 1
+
+
+def test_invalidation_and_disabled_cache():
+    """Test invalidating entries and a cache with max_size zero.
+
+    Verifies:
+    - invalidate and clear drop entries and bump the generation
+    - A value loaded before an invalidation is not stored
+    - A cache with max_size zero never stores anything
+    """
+    cache = TTLCache(max_size=10, ttl_seconds=60)
+    cache.set("a", 1)
+    generation = cache.generation
+    cache.invalidate("a")
+    assert cache.get("a") is None
+    cache.set("a", 1, generation=generation)
+    assert cache.get("a") is None
+    cache.set("a", 2, generation=cache.generation)
+    assert cache.get("a") == 2
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.stats()["hits"] == 0
+
+    disabled = TTLCache(max_size=0, ttl_seconds=60)
+    disabled.set("a", 1)
+    assert disabled.get("a") is None
+    assert len(disabled) == 0
@@ -0,0 +1,46 @@
+import pytest
+from database.mongodb import mongodb
+from repositories.indexes import (
+    CollectionScanError,
+    find_collection_scans,
+    query_shapes,
+    verify_query_plans,
+)
+
+# ============================================================================
+# INDEX TESTS
+# ============================================================================
+
+
+def test_indexes_created_at_startup(client):
+    """Test that the repository indexes exist after startup.
+
+    Verifies:
+    - The unique username and email indexes are created
+    """
+    assert mongodb.db is not None
+    index_names = client.portal.call(mongodb.db["users"].index_information)
+    assert "username_unique_idx" in index_names
+    assert "email_unique_idx" in index_names
+
+
+def test_repository_queries_use_indexes(client):
+    """Test the query plans of every registered repository query.
+
+    Verifies:
+    - The users and rate_limits lookups are registered
+    - No registered query shape is planned as a collection scan
+    """
+    assert {"users", "rate_limits"} <= query_shapes.keys()
+    assert client.portal.call(find_collection_scans, mongodb.db) == []
+
+
+def test_collection_scan_detected(client, monkeypatch):
+    """Test that an unindexed query shape fails the plan check.
+
+    Verifies:
+    - A filter on an unindexed field raises CollectionScanError
+    """
+    monkeypatch.setitem(query_shapes, "users", [{"hashed_password": "hash"}])
+    with pytest.raises(CollectionScanError):
+        client.portal.call(verify_query_plans, mongodb.db)
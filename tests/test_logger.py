@@ -0,0 +1,154 @@
+import json
+import logging
+import queue
+import sys
+
+from core.logger import DroppingQueueHandler, JsonFormatter
+
+
+def make_record(
+    msg: str = "hello %s", args: tuple = ("world",), **extra
+) -> logging.LogRecord:
+    """Build a log record as a logger call at a fixed time would."""
+    record = logging.LogRecord(
+        name="app.test",
+        level=logging.INFO,
+        pathname=__file__,
+        lineno=42,
+        msg=msg,
+        args=args,
+        exc_info=None,
+        func="handler",
+    )
+    record.created = 1_767_225_600.25
+    record.__dict__.update(extra)
+    return record
+
+
+# ============================================================================
+# JSON FORMATTER TESTS
+# ============================================================================
+
+
+def test_json_formatter_record_shape():
+    """Test the fields of a formatted record.
+
+    Verifies:
+    - The base fields come first, in a fixed order
+    - Known extra fields are included and unset ones left out
+    - Unknown record attributes are ignored
+    """
+    record = make_record(request_id="abc", status_code=200, path=None, user="x")
+    data = json.loads(JsonFormatter().format(record))
+    assert data == {
+        "timestamp": "2026-01-01T00:00:00.250000+00:00",
+        "level": "INFO",
+        "logger": "app.test",
+        "module": "test_logger",
+        "function": "handler",
+        "line": 42,
+        "message": "hello world",
+        "request_id": "abc",
+        "status_code": 200,
+    }
+
+
+def test_json_formatter_output_encoding():
+    """Test the serialized form of a record.
+
+    Verifies:
+    - Separators are compact and non-ASCII characters are not escaped
+    - Values orjson cannot serialize fall back to json or to their str()
+    """
+    formatter = JsonFormatter()
+    line = formatter.format(make_record(msg="café", args=()))
+    assert '"message":"café"' in line
+    assert ", " not in line
+    big = json.loads(formatter.format(make_record(duration_ms=2**70)))
+    assert big["duration_ms"] == 2**70
+    other = json.loads(formatter.format(make_record(query_params=object)))
+    assert other["query_params"] == str(object)
+
+
+def test_json_formatter_exception():
+    """Test formatting a record with an exception.
+
+    Verifies:
+    - The traceback is rendered in the exception field
+    """
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        record = make_record()
+        record.exc_info = sys.exc_info()
+    data = json.loads(JsonFormatter().format(record))
+    assert data["exception"].startswith("Traceback")
+    assert data["exception"].endswith("ValueError: boom")
+
+
+# ============================================================================
+# QUEUE HANDLER TESTS
+# ============================================================================
+
+
+def queued_messages(log_queue: queue.Queue) -> list[str]:
+    """Drain the queue and return the queued messages."""
+    messages = []
+    while not log_queue.empty():
+        messages.append(log_queue.get_nowait().getMessage())
+    return messages
+
+
+def test_queue_handler_drop_new():
+    """Test the drop_new policy on a full queue.
+
+    Verifies:
+    - Records that do not fit are discarded and counted
+    - Queued records are kept, already merged with their arguments
+    """
+    log_queue: queue.Queue = queue.Queue(maxsize=2)
+    handler = DroppingQueueHandler(queue=log_queue, drop_policy="drop_new")
+    for i in range(3):
+        handler.handle(make_record(args=(i,)))
+    assert (handler.enqueued, handler.dropped) == (2, 1)
+    assert queued_messages(log_queue) == ["hello 0", "hello 1"]
+
+
+def test_queue_handler_drop_oldest():
+    """Test the drop_oldest policy on a full queue.
+
+    Verifies:
+    - The oldest queued record makes room for the new one
+    - Both the dropped and the enqueued records are counted
+    """
+    log_queue: queue.Queue = queue.Queue(maxsize=2)
+    handler = DroppingQueueHandler(queue=log_queue, drop_policy="drop_oldest")
+    for i in range(3):
+        handler.handle(make_record(args=(i,)))
+    assert (handler.enqueued, handler.dropped) == (3, 1)
+    assert queued_messages(log_queue) == ["hello 1", "hello 2"]
+
+
+def test_queue_handler_prepares_records():
+    """Test the records handed to the listener thread.
+
+    Verifies:
+    - Arguments are merged and the traceback rendered to text
+    - The caller's record is left untouched
+    """
+    handler = DroppingQueueHandler(queue=queue.Queue())
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        record = make_record()
+        record.exc_info = sys.exc_info()
+    prepared = handler.prepare(record)
+    assert (prepared.msg, prepared.args, prepared.exc_info) == (
+        "hello world",
+        None,
+        None,
+    )
+    assert prepared.exc_text is not None
+    assert prepared.exc_text.endswith("ValueError: boom")
+    assert record.args == ("world",)
+    assert record.exc_info is not None
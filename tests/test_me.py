@@ -1,4 +1,19 @@
+import asyncio
+
+from core.config import settings
+from core.jwt import create_access_token
+from core.logger import request_log_policy
 from faker import Faker
+from services import user as user_service
+from services.user import change_password as change_user_password
+from services.user import (
+    get_token_version,
+    get_user,
+    get_user_in_db,
+    token_version_cache,
+    user_batch_loader,
+    user_lookups,
+)
 
 from app.core.constants import API_PREFIX
 
@@ -217,3 +232,255 @@ def test_change_password_invalid_token(client):
         },
     )
     assert response.status_code == 401
+
+
+def test_change_password_detects_concurrent_change(client, registered_user):
+    """Test that a password change based on stale credentials is rejected.
+
+    Verifies:
+    - The first change with the loaded credentials succeeds
+    - A second change with the same, now stale, credentials matches nothing
+    """
+    user = client.portal.call(get_user_in_db, registered_user["username"])
+    assert client.portal.call(change_user_password, user, fake.password()) is not None
+    assert client.portal.call(change_user_password, user, fake.password()) is None
+
+
+def test_change_password_revokes_tokens(client, registered_user):
+    """Test that changing the password revokes previously issued tokens.
+
+    Verifies:
+    - An access token issued before the change is rejected afterwards
+    - A refresh token issued before the change is rejected afterwards
+    """
+    login_response = client.post(
+        url=f"{API_PREFIX}/auth/login",
+        data={
+            "username": registered_user["username"],
+            "password": registered_user["password"],
+        },
+    )
+    tokens = login_response.json()
+    response = client.patch(
+        url=change_password,
+        headers={"Authorization": f"Bearer {tokens['access_token']}"},
+        json={
+            "old_password": registered_user["password"],
+            "new_password": fake.password(),
+        },
+    )
+    assert response.status_code == 200
+    me_response = client.get(
+        url=me, headers={"Authorization": f"Bearer {tokens['access_token']}"}
+    )
+    assert me_response.status_code == 401
+    refresh_response = client.post(
+        url=f"{API_PREFIX}/auth/refresh",
+        json={"refresh_token": tokens["refresh_token"]},
+    )
+    assert refresh_response.status_code == 401
+
+
+# ============================================================================
+# STATELESS CLAIMS TESTS
+# ============================================================================
+
+
+def test_stateless_claims_current_user(client, registered_user, monkeypatch):
+    """Test retrieving the current user from token claims.
+
+    Verifies:
+    - The user is built from the token claims
+    - Tokens issued before a password change are rejected
+    """
+    monkeypatch.setattr(settings, "AUTH_STATELESS_CLAIMS", True)
+    login_response = client.post(
+        url=f"{API_PREFIX}/auth/login",
+        data={
+            "username": registered_user["username"],
+            "password": registered_user["password"],
+        },
+    )
+    headers = {"Authorization": f"Bearer {login_response.json()['access_token']}"}
+    response = client.get(url=me, headers=headers)
+    data = response.json()
+    assert response.status_code == 200, f"Error: {data}"
+    assert data["username"] == registered_user["username"]
+    assert data["email"] == registered_user["email"]
+    client.patch(
+        url=change_password,
+        headers=headers,
+        json={
+            "old_password": registered_user["password"],
+            "new_password": fake.password(),
+        },
+    )
+    assert client.get(url=me, headers=headers).status_code == 401
+
+
+def test_stateless_claims_require_user_claims(client, registered_user, monkeypatch):
+    """Test that a token without the user claims is rejected in stateless mode.
+
+    Verifies:
+    - A current token minted without the email claim returns 401
+    """
+    monkeypatch.setattr(settings, "AUTH_STATELESS_CLAIMS", True)
+    token = create_access_token(
+        data={"sub": registered_user["username"], "token_version": 0}
+    )
+    response = client.get(url=me, headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 401
+
+
+def test_response_has_request_id(authenticated_client):
+    """Test that every response carries a request ID.
+
+    Verifies:
+    - X-Request-ID header is set by the logging middleware
+    """
+    response = authenticated_client.get(url=me)
+    assert response.status_code == 200
+    assert response.headers["x-request-id"]
+
+
+# ============================================================================
+# LOOKUP COALESCING TESTS
+# ============================================================================
+
+
+def test_concurrent_user_lookups_are_coalesced(client, registered_user):
+    """Test that concurrent cache misses for a user share one lookup.
+
+    Verifies:
+    - Every caller gets the user
+    - Only the first caller issues the lookup
+    """
+    username = registered_user["username"]
+    coalesced = user_lookups.coalesced
+
+    async def lookup_concurrently():
+        return await asyncio.gather(*(get_user(username) for _ in range(5)))
+
+    users = client.portal.call(lookup_concurrently)
+    assert [user.username for user in users] == [username] * 5
+    assert user_lookups.coalesced - coalesced == 4
+
+
+def test_user_lookups_are_batched(
+    client, registered_user, valid_user_data, monkeypatch
+):
+    """Test that lookups within the batch window share one $in query.
+
+    Verifies:
+    - Distinct usernames are loaded in a single batch
+    - A repeated username is coalesced into the batch
+    - Unknown usernames resolve to None
+    """
+    monkeypatch.setattr(settings, "USER_LOOKUP_BATCH_WINDOW_MS", 5.0)
+    monkeypatch.setattr(user_batch_loader, "window_seconds", 0.005)
+    other_username = f"{registered_user['username']}_other"
+    client.post(
+        url=f"{API_PREFIX}/auth/register",
+        json={**valid_user_data, "username": other_username, "email": None},
+    )
+    usernames = [registered_user["username"], other_username]
+    stats = user_batch_loader.stats()
+
+    async def lookup_concurrently():
+        return await asyncio.gather(
+            *(get_user(username) for username in [*usernames, usernames[0], "nobody"])
+        )
+
+    users = client.portal.call(lookup_concurrently)
+    assert [user.username for user in users[:3]] == [*usernames, usernames[0]]
+    assert users[3] is None
+    assert user_batch_loader.batches - stats["batches"] == 1
+    assert user_batch_loader.batched_keys - stats["batched_keys"] == 3
+    assert user_batch_loader.coalesced - stats["coalesced"] == 1
+
+
+def test_token_version_lookup_does_not_restore_revoked_version(monkeypatch):
+    """Test that a lookup racing a password change does not cache its result.
+
+    Verifies:
+    - The version read before the change is not written back to the cache
+    - Lookups started after the change do not share the older lookup
+    """
+    username = fake.user_name()
+    old_version_read = asyncio.Event()
+    release = asyncio.Event()
+
+    async def slow_find_token_version(username: str) -> int:
+        old_version_read.set()
+        await release.wait()
+        return 0
+
+    async def fresh_find_token_version(username: str) -> int:
+        return 1
+
+    async def scenario():
+        monkeypatch.setattr(user_service, "find_token_version", slow_find_token_version)
+        stale_lookup = asyncio.create_task(get_token_version(username))
+        await old_version_read.wait()
+        token_version_cache.invalidate(username)
+        monkeypatch.setattr(
+            user_service, "find_token_version", fresh_find_token_version
+        )
+        assert await asyncio.wait_for(get_token_version(username), timeout=1) == 1
+        token_version_cache.invalidate(username)
+        release.set()
+        assert await stale_lookup == 0
+        assert token_version_cache.get(username) is None
+
+    asyncio.run(scenario())
+
+
+# ============================================================================
+# REQUEST LOG SAMPLING TESTS
+# ============================================================================
+
+
+def _request_log_messages(caplog) -> list[str]:
+    return [
+        record.getMessage()
+        for record in caplog.records
+        if record.name == "middlewares.logging"
+    ]
+
+
+def test_unsampled_request_logs_only_errors(
+    authenticated_client, client, monkeypatch, caplog
+):
+    """Test that unsampled requests are only logged when they fail.
+
+    Verifies:
+    - A successful request on a path sampled at 0 writes no request records
+    - A failed request on the same path still logs its completion
+    """
+    monkeypatch.setattr(request_log_policy, "path_sample_rates", [(me, 0.0)])
+    caplog.set_level("INFO", logger="middlewares.logging")
+    response = authenticated_client.get(url=me)
+    assert response.status_code == 200
+    assert _request_log_messages(caplog) == []
+    response = client.get(url=me, headers={"Authorization": "Bearer invalid_token"})
+    assert response.status_code == 401
+    assert _request_log_messages(caplog) == [f"Request completed: GET {me} - 401"]
+
+
+def test_single_line_request_log(authenticated_client, monkeypatch, caplog):
+    """Test collapsing the request records into one completion record.
+
+    Verifies:
+    - Only the completion record is written
+    - It carries the client host and query string
+    """
+    monkeypatch.setattr(request_log_policy, "single_line", True)
+    caplog.set_level("INFO", logger="middlewares.logging")
+    response = authenticated_client.get(url=me, params={"q": "1"})
+    assert response.status_code == 200
+    assert _request_log_messages(caplog) == [f"Request completed: GET {me} - 200"]
+    record = next(
+        record for record in caplog.records if record.name == "middlewares.logging"
+    )
+    assert record.query_params == "q=1"
+    assert record.client_host
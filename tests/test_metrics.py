@@ -0,0 +1,84 @@
+import json
+import re
+
+from core.config import settings
+from core.metrics import registry
+
+from app.core.constants import API_PREFIX
+
+# Endpoint paths
+metrics = f"{API_PREFIX}/metrics"
+me = f"{API_PREFIX}/me"
+
+
+# ============================================================================
+# METRICS TESTS
+# ============================================================================
+
+
+def test_metrics_token(client, monkeypatch):
+    """Test scraping metrics with METRICS_TOKEN set.
+
+    Verifies:
+    - Returns 401 without the token or with a wrong one
+    - Returns 200 with the bearer token
+    """
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "scrape-secret")
+    assert client.get(url=metrics).status_code == 401
+    wrong = client.get(url=metrics, headers={"Authorization": "Bearer other"})
+    assert wrong.status_code == 401
+    response = client.get(
+        url=metrics, headers={"Authorization": "Bearer scrape-secret"}
+    )
+    assert response.status_code == 200
+
+
+def test_metrics_exposition(authenticated_client):
+    """Test the Prometheus metrics endpoint.
+
+    Verifies:
+    - Returns 200 with the Prometheus text content type
+    - Requests are counted per route template and status
+    - Password hashing, JWT and MongoDB operations are recorded
+    """
+    assert authenticated_client.get(url=me).status_code == 200
+    response = authenticated_client.get(url=metrics)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert "# TYPE http_request_duration_seconds histogram" in body
+    assert re.search(
+        r'http_requests_total\{method="GET",route="[^"]*/me",status="200"\}', body
+    )
+    assert 'password_hash_duration_seconds_count{operation="hash"}' in body
+    assert 'password_hash_duration_seconds_count{operation="verify"}' in body
+    assert 'jwt_operations_total{operation="encode",result="ok"}' in body
+    assert (
+        "mongodb_operation_duration_seconds_count"
+        '{collection="users",operation="find_public_user"}'
+    ) in body
+
+
+def test_metrics_multiprocess(client, monkeypatch, tmp_path):
+    """Test merging the metrics of several workers.
+
+    Verifies:
+    - Snapshots written by other workers are summed into the scrape
+    - The serving worker writes its own snapshot
+    """
+    monkeypatch.setattr(registry, "multiprocess_dir", tmp_path)
+    other_worker = {
+        "http_requests_total": {
+            "type": "counter",
+            "help": "HTTP requests by method, route template and status code",
+            "labelnames": ["method", "route", "status"],
+            "samples": [[["GET", "/other", "200"], 41]],
+        }
+    }
+    (tmp_path / "1.json").write_text(json.dumps(other_worker))
+    response = client.get(url=metrics)
+    assert response.status_code == 200
+    assert 'http_requests_total{method="GET",route="/other",status="200"} 41' in (
+        response.text
+    )
+    assert len(list(tmp_path.glob("*.json"))) == 2
@@ -0,0 +1,165 @@
+import asyncio
+from datetime import timedelta
+from types import SimpleNamespace
+
+from core.config import settings
+from core.logger import current_request_id
+from database.mongodb import MongoDB, client_options
+from database.monitoring import CommandMonitor, PoolMonitor, query_shape
+from pymongo import monitoring
+
+ADDRESS = ("localhost", 27017)
+
+
+def run_command(
+    monitor: CommandMonitor, command: dict, duration_ms: float, request_id: int = 1
+) -> None:
+    """Feed a started and a succeeded event for ``command`` to ``monitor``."""
+    command_name = next(iter(command))
+    monitor.started(
+        monitoring.CommandStartedEvent(
+            command, "test-database", request_id, ADDRESS, request_id
+        )
+    )
+    monitor.succeeded(
+        monitoring.CommandSucceededEvent(
+            timedelta(milliseconds=duration_ms),
+            {"ok": 1},
+            command_name,
+            request_id,
+            ADDRESS,
+            request_id,
+        )
+    )
+
+
+# ============================================================================
+# MONGODB MONITORING TESTS
+# ============================================================================
+
+
+def test_query_shape():
+    """Test that filter values are masked.
+
+    Verifies:
+    - Fields and operators are kept, values become "?"
+    """
+    assert query_shape(
+        {"username": "alice", "$or": [{"age": {"$gt": 3}}], "role": {"$in": [1, 2]}}
+    ) == {"username": "?", "$or": [{"age": {"$gt": "?"}}], "role": {"$in": "?"}}
+
+
+def test_slow_command_log(caplog):
+    """Test logging commands above the slow threshold.
+
+    Verifies:
+    - Fast commands are only counted
+    - Slow commands are logged with collection, filter shape and request ID
+    """
+    monitor = CommandMonitor(slow_command_ms=50)
+    caplog.set_level("WARNING", logger="database.monitoring")
+    run_command(monitor, {"find": "users", "filter": {"username": "a"}}, 1)
+    assert caplog.records == []
+    token = current_request_id.set("request-1")
+    try:
+        run_command(
+            monitor, {"find": "users", "filter": {"username": "b"}}, 80, request_id=2
+        )
+    finally:
+        current_request_id.reset(token)
+    [record] = caplog.records
+    assert record.collection == "users"
+    assert record.filter_shape == {"username": "?"}
+    assert record.request_id == "request-1"
+    stats = monitor.stats()["find"]
+    assert stats["count"] == 2
+    assert stats["slow"] == 1
+    assert stats["seconds_max"] == 0.08
+
+
+def test_pool_checkout_wait():
+    """Test pool statistics.
+
+    Verifies:
+    - Checkout waits, connections in use and churn are recorded
+    """
+    monitor = PoolMonitor()
+    monitor.connection_created(monitoring.ConnectionCreatedEvent(ADDRESS, 1))
+    monitor.connection_checked_out(
+        monitoring.ConnectionCheckedOutEvent(ADDRESS, 1, 0.25)
+    )
+    stats = monitor.stats()
+    assert stats["connections_created"] == 1
+    assert stats["checked_out"] == 1
+    assert stats["checkout_wait_seconds_max"] == 0.25
+    monitor.connection_checked_in(monitoring.ConnectionCheckedInEvent(ADDRESS, 1))
+    assert monitor.stats()["checked_out"] == 0
+
+
+# ============================================================================
+# MONGODB CLIENT TESTS
+# ============================================================================
+
+
+def test_client_options(monkeypatch):
+    """Test the client options built from settings.
+
+    Verifies:
+    - Unset and empty settings are left to the connection string
+    - Set ones are passed with their PyMongo option names
+    """
+    for name in (
+        "MONGODB_MAX_POOL_SIZE",
+        "MONGODB_MIN_POOL_SIZE",
+        "MONGODB_MAX_IDLE_TIME_MS",
+        "MONGODB_WAIT_QUEUE_TIMEOUT_MS",
+        "MONGODB_SERVER_SELECTION_TIMEOUT_MS",
+    ):
+        monkeypatch.setattr(settings, name, None)
+    monkeypatch.setattr(settings, "MONGODB_COMPRESSORS", "")
+    monkeypatch.setattr(settings, "MONGODB_APP_NAME", "")
+    assert client_options() == {}
+
+    monkeypatch.setattr(settings, "MONGODB_MAX_POOL_SIZE", 50)
+    monkeypatch.setattr(settings, "MONGODB_MIN_POOL_SIZE", 0)
+    monkeypatch.setattr(settings, "MONGODB_COMPRESSORS", "zstd,zlib")
+    monkeypatch.setattr(settings, "MONGODB_APP_NAME", "api")
+    assert client_options() == {
+        "maxPoolSize": 50,
+        "minPoolSize": 0,
+        "compressors": "zstd,zlib",
+        "appname": "api",
+    }
+
+
+def test_warm_up_opens_min_pool_connections(monkeypatch):
+    """Test the startup warm-up.
+
+    Verifies:
+    - One ping runs per minimum pool connection, all at once
+    - A single ping runs when no minimum pool size is set
+    """
+    in_flight = 0
+    max_in_flight = 0
+    pings = 0
+
+    async def command(name: str) -> dict:
+        nonlocal in_flight, max_in_flight, pings
+        assert name == "ping"
+        pings += 1
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0)
+        in_flight -= 1
+        return {"ok": 1}
+
+    database = MongoDB()
+    fake_client = SimpleNamespace(admin=SimpleNamespace(command=command))
+    monkeypatch.setattr(database, "client", fake_client)
+    monkeypatch.setattr(settings, "MONGODB_MIN_POOL_SIZE", 3)
+    asyncio.run(database.warm_up())
+    assert (pings, max_in_flight) == (3, 3)
+
+    monkeypatch.setattr(settings, "MONGODB_MIN_POOL_SIZE", None)
+    asyncio.run(database.warm_up())
+    assert pings == 4
@@ -0,0 +1,58 @@
+from fastapi.datastructures import DefaultPlaceholder
+from fastapi.routing import APIRoute
+from routers.auth import auth_router
+from routers.me import me_router
+from schemas.user import Token, User, UserInDB
+
+# ============================================================================
+# RESPONSE RENDERING TESTS
+# ============================================================================
+
+
+def test_json_routes_use_pydantic_serialization():
+    """Test that JSON routes keep FastAPI's direct JSON serialization.
+
+    Verifies:
+    - Every auth and me route declares a response model
+    - None of them sets a custom response class, which would disable it
+    """
+    routes = [*auth_router.routes, *me_router.routes]
+    assert routes
+    for route in routes:
+        assert isinstance(route, APIRoute)
+        assert route.response_field is not None, route.path
+        assert isinstance(route.response_class, DefaultPlaceholder), route.path
+
+
+def test_declared_model_instances_are_not_rebuilt():
+    """Test that returning the declared model skips rebuilding the response.
+
+    Verifies:
+    - Response validation passes User and Token instances through unchanged
+    - A User built from a stored document serializes without its extra fields
+    """
+    responses = {
+        "/me": User.model_construct(username="alice", email=None),
+        "/auth/login": Token(
+            access_token="access", refresh_token="refresh", token_type="bearer"
+        ),
+    }
+    routes = {
+        route.path: route
+        for route in [*auth_router.routes, *me_router.routes]
+        if isinstance(route, APIRoute)
+    }
+    for path, response in responses.items():
+        field = routes[path].response_field
+        assert field is not None
+        value, errors = field.validate(response, {}, loc=("response",))
+        assert not errors
+        assert value is response, path
+
+    user = UserInDB.from_document(
+        {"username": "bob", "hashed_password": "hash", "token_version": 1}
+    ).to_user()
+    me_field = routes["/me"].response_field
+    assert me_field is not None
+    assert type(user) is User
+    assert me_field.serialize_json(user) == b'{"username":"bob","email":null}'
@@ -0,0 +1,51 @@
+from bson import ObjectId
+from schemas.user import User, UserInDB
+
+# ============================================================================
+# DOCUMENT CONVERSION TESTS
+# ============================================================================
+
+
+def test_from_document_applies_defaults_and_ignores_extra_fields():
+    """Test that from_document builds models like validation would.
+
+    Verifies:
+    - Missing optional fields take their declared defaults
+    - Fields the model does not declare, such as _id, are dropped
+    """
+    document = {
+        "_id": ObjectId(),
+        "username": "alice",
+        "hashed_password": "hash",
+        "disabled": False,
+    }
+
+    user = UserInDB.from_document(document)
+
+    assert user.token_version == 0
+    assert user.email is None
+    assert user.model_dump() == {
+        "username": "alice",
+        "email": None,
+        "hashed_password": "hash",
+        "token_version": 0,
+    }
+    assert User.from_document(document).model_dump() == {
+        "username": "alice",
+        "email": None,
+    }
+
+
+def test_from_document_does_not_validate():
+    """Test that from_document trusts the stored document.
+
+    Verifies:
+    - Values are kept as stored, even ones validation would reject
+    - The public model drops the credentials of a stored user
+    """
+    user = UserInDB.from_document(
+        {"username": "bob", "email": "not-an-email", "hashed_password": "hash"}
+    )
+
+    assert user.email == "not-an-email"
+    assert user.to_user().model_dump() == {"username": "bob", "email": "not-an-email"}
@@ -0,0 +1,124 @@
+import jwt
+import pytest
+from core.config import settings
+from core.keyring import KeyRing, keyring
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+
+from app.core.constants import API_PREFIX
+
+# Endpoint paths
+jwks = "/.well-known/jwks.json"
+login = f"{API_PREFIX}/auth/login"
+me = f"{API_PREFIX}/me"
+
+
+def use_asymmetric_keyring(monkeypatch, algorithm: str) -> None:
+    """Switch token signing to an empty asymmetric keyring for one test."""
+    monkeypatch.setattr(settings, "JWT_ALGORITHM", algorithm)
+    monkeypatch.setattr(keyring, "algorithm", algorithm)
+    monkeypatch.setattr(keyring, "keys", {})
+    monkeypatch.setattr(keyring, "active_kid", None)
+    monkeypatch.setattr(keyring, "_jwks", None)
+
+
+# ============================================================================
+# JWKS TESTS
+# ============================================================================
+
+
+def test_jwks_etag(client, monkeypatch):
+    """Test JWKS caching headers.
+
+    Verifies:
+    - Returns 200 with an ETag and Cache-Control
+    - Returns 304 when If-None-Match matches the ETag
+    """
+    use_asymmetric_keyring(monkeypatch, "EdDSA")
+    response = client.get(url=jwks)
+    assert response.status_code == 200
+    assert response.headers["cache-control"].startswith("public")
+    etag = response.headers["etag"]
+    not_modified = client.get(url=jwks, headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+
+
+def test_jwks_verifies_issued_tokens(client, registered_user, monkeypatch):
+    """Test that published keys verify issued tokens.
+
+    Verifies:
+    - Tokens carry the kid of a published key
+    - The token verifies with that public key
+    - The token authenticates against the API
+    """
+    use_asymmetric_keyring(monkeypatch, "ES256")
+    login_response = client.post(
+        url=login,
+        data={
+            "username": registered_user["username"],
+            "password": registered_user["password"],
+        },
+    )
+    token = login_response.json()["access_token"]
+    jwk_set = jwt.PyJWKSet.from_dict(client.get(url=jwks).json())
+    signing_key = jwk_set[jwt.get_unverified_header(token)["kid"]]
+    payload = jwt.decode(token, signing_key.key, algorithms=["ES256"])
+    assert payload["sub"] == registered_user["username"]
+    response = client.get(url=me, headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+
+
+def test_jwks_rotation_keeps_previous_key(client, monkeypatch):
+    """Test key rotation overlap.
+
+    Verifies:
+    - After a rotation both keys are published
+    - The ETag changes
+    """
+    use_asymmetric_keyring(monkeypatch, "EdDSA")
+    first = client.get(url=jwks)
+    keyring.rotate()
+    second = client.get(url=jwks)
+    assert len(second.json()["keys"]) == len(first.json()["keys"]) + 1
+    assert first.headers["etag"] != second.headers["etag"]
+
+
+# ============================================================================
+# KEY LOADING TESTS
+# ============================================================================
+
+
+def write_private_key(path, private_key) -> None:
+    """Write an unencrypted PEM private key."""
+    path.write_bytes(
+        private_key.private_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PrivateFormat.PKCS8,
+            encryption_algorithm=serialization.NoEncryption(),
+        )
+    )
+
+
+def test_load_directory_rejects_mismatched_keys(tmp_path):
+    """Test loading key files that cannot sign with the JWT algorithm.
+
+    Verifies:
+    - A P-256 key loads for ES256
+    - An Ed25519 key and a P-384 key are rejected for ES256, naming the file
+    - An empty key directory is rejected instead of generating a key
+    """
+    ring = KeyRing(algorithm="ES256", overlap_seconds=60)
+    write_private_key(tmp_path / "1.pem", ec.generate_private_key(ec.SECP256R1()))
+    ring.load_directory(tmp_path)
+    assert ring.active_kid is not None
+
+    for private_key in (
+        ed25519.Ed25519PrivateKey.generate(),
+        ec.generate_private_key(ec.SECP384R1()),
+    ):
+        write_private_key(tmp_path / "2.pem", private_key)
+        with pytest.raises(ValueError, match="2.pem: JWT_ALGORITHM ES256 needs P-256"):
+            KeyRing(algorithm="ES256", overlap_seconds=60).load_directory(tmp_path)
+
+    with pytest.raises(ValueError, match="No \\*.pem private keys"):
+        ring.load_directory(tmp_path / "missing")